@@ -4,6 +4,8 @@
 Python3 面向对象编程示例：类、对象、继承、多态
 """
 
+import heapq
+
 def basic_class_demo():
     """基础类演示"""
     print("=" * 50)
@@ -334,11 +336,8 @@ def practical_oop_example():
             return round(total_avg / len(self.students), 2)
         
         def get_top_students(self, n=3):
-            """获取前n名学生"""
-            sorted_students = sorted(self.students, 
-                                   key=lambda s: s.get_average(), 
-                                   reverse=True)
-            return sorted_students[:n]
+            """获取前n名学生（heapq.nlargest 只维护n个元素的堆，不必整体排序）"""
+            return heapq.nlargest(n, self.students, key=lambda s: s.get_average())
         
         def display_class_info(self):
             """显示班级信息"""
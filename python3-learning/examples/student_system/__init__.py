@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+学生成绩管理系统
+入口和交互菜单见 examples/project_example.py
+"""
+
+from .models import (
+    GRADE_LEVELS,
+    grade_level_of,
+    Student,
+    SymbolTable,
+    SUBJECT_TABLE,
+    GRADE_TABLE,
+    EPOCH,
+    ONE_MICROSECOND,
+    CompactStudent,
+)
+from .indexes import (
+    StudentIndex,
+    NameSearchIndex,
+    ColumnarScoreStore,
+    ClassAggregates,
+    Leaderboard,
+    ScoreHistogram,
+    DistributionSketches,
+    SubjectScoreIndex,
+)
+from .changes import (
+    MutationJournal,
+    ChangeFeed,
+    ScoreHistory,
+)
+from .storage import (
+    iter_json_array,
+    iter_students,
+    StorageBackend,
+    JsonFileBackend,
+    SQLiteBackend,
+    BinaryRoster,
+    BinaryFileBackend,
+    JsonCodec,
+    MarshalCodec,
+    StructCodec,
+    CompressedCodec,
+    CODECS,
+    register_codec,
+    get_codec,
+    CodecFileBackend,
+)
+from .query import (
+    StudentQuery,
+)
+from .manager import (
+    print_student_table,
+    RosterView,
+    StudentManager,
+    ShardedStudentManager,
+)
+from .concurrency import (
+    ReadWriteLock,
+    LockedStudentQuery,
+    ConcurrentStudentManager,
+    AutoSaver,
+)
+from .service import (
+    StudentService,
+)
+from .benchmarks import (
+    student_memory_comparison,
+    codec_benchmark,
+    concurrency_demo,
+    service_benchmark,
+)
+
+__all__ = [
+    "GRADE_LEVELS",
+    "grade_level_of",
+    "Student",
+    "SymbolTable",
+    "SUBJECT_TABLE",
+    "GRADE_TABLE",
+    "EPOCH",
+    "ONE_MICROSECOND",
+    "CompactStudent",
+    "StudentIndex",
+    "NameSearchIndex",
+    "ColumnarScoreStore",
+    "ClassAggregates",
+    "Leaderboard",
+    "ScoreHistogram",
+    "DistributionSketches",
+    "SubjectScoreIndex",
+    "MutationJournal",
+    "ChangeFeed",
+    "ScoreHistory",
+    "iter_json_array",
+    "iter_students",
+    "StorageBackend",
+    "JsonFileBackend",
+    "SQLiteBackend",
+    "BinaryRoster",
+    "BinaryFileBackend",
+    "JsonCodec",
+    "MarshalCodec",
+    "StructCodec",
+    "CompressedCodec",
+    "CODECS",
+    "register_codec",
+    "get_codec",
+    "CodecFileBackend",
+    "StudentQuery",
+    "print_student_table",
+    "RosterView",
+    "StudentManager",
+    "ShardedStudentManager",
+    "ReadWriteLock",
+    "LockedStudentQuery",
+    "ConcurrentStudentManager",
+    "AutoSaver",
+    "StudentService",
+    "student_memory_comparison",
+    "codec_benchmark",
+    "concurrency_demo",
+    "service_benchmark",
+]
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""演示和性能对比：内存、编解码器、并发一致性和服务压测"""
+
+import io
+import os
+import asyncio
+import datetime
+import threading
+import time
+from contextlib import redirect_stdout
+
+from .models import CompactStudent, Student
+from .storage import CODECS, get_codec
+from .manager import StudentManager
+from .concurrency import ConcurrentStudentManager
+from .service import StudentService, _http_request
+
+def student_memory_comparison(student_count=20000):
+    """用 tracemalloc 测量 Student 和 CompactStudent 每名学生占用的内存，返回结果字典"""
+    import random
+    import tracemalloc
+
+    def build(student_class):
+        rng = random.Random(42)
+        students = []
+        for i in range(student_count):
+            student = student_class(f"2024{i:06d}", f"学生{i}",
+                                    rng.choice(["高一", "高二", "高三"]), rng.randint(15, 18))
+            for subject in ("数学", "语文", "英语", "物理", "化学"):
+                student.add_score(subject, float(rng.randint(40, 100)))
+            student.get_average()
+            students.append(student)
+        return students
+
+    results = {}
+    for student_class in (Student, CompactStudent):
+        tracemalloc.start()
+        students = build(student_class)
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[student_class.__name__] = current / student_count
+        del students
+
+    saving = 1 - results["CompactStudent"] / results["Student"]
+    print(f"\n🧮 学生对象内存对比（{student_count} 名学生，每人5门成绩）：")
+    print(f"Student:        {results['Student']:.0f} 字节/人")
+    print(f"CompactStudent: {results['CompactStudent']:.0f} 字节/人（节省 {saving:.0%}）")
+    return results
+
+def codec_benchmark(student_count=20000, repeat=3, codecs=None):
+    """比较各编解码器的编码/解码吞吐量和体积，返回结果列表"""
+    import random
+    
+    rng = random.Random(42)
+    students = []
+    for i in range(student_count):
+        student = Student(f"2024{i:06d}", f"学生{i}", rng.choice(["高一", "高二", "高三"]),
+                          rng.randint(15, 18))
+        for subject in ("数学", "语文", "英语", "物理", "化学"):
+            student.add_score(subject, float(rng.randint(40, 100)))
+        students.append(student)
+    
+    results = []
+    for name in codecs or CODECS:
+        codec = get_codec(name)
+        encode_time = decode_time = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            payload = codec.encode(students)
+            encode_time = min(encode_time, time.perf_counter() - start)
+            start = time.perf_counter()
+            decoded = codec.decode(payload)
+            decode_time = min(decode_time, time.perf_counter() - start)
+        if len(decoded) != len(students):
+            raise ValueError(f"{name} 解码后的人数不一致")
+        results.append({
+            "codec": name,
+            "size": len(payload),
+            "encode_per_sec": student_count / encode_time,
+            "decode_per_sec": student_count / decode_time,
+        })
+    
+    print(f"\n📦 编解码器对比（{student_count} 名学生，每项取 {repeat} 次中最快的一次）：")
+    print("-" * 72)
+    print(f"{'编解码器':<20} {'体积(KB)':>10} {'编码(人/秒)':>14} {'解码(人/秒)':>14}")
+    print("-" * 72)
+    for row in results:
+        print(f"{row['codec']:<22} {row['size'] / 1024:>10.1f} "
+              f"{row['encode_per_sec']:>16,.0f} {row['decode_per_sec']:>16,.0f}")
+    return results
+
+def concurrency_demo(writer_count=4, reader_count=4, students_per_writer=300):
+    """并发压力演示：多个线程同时写入和查询，检查结果始终一致"""
+    import random
+    import tempfile
+    
+    print("🧵 并发压力演示")
+    data_file = os.path.join(tempfile.mkdtemp(), "concurrent_students.json")
+    with redirect_stdout(io.StringIO()):
+        manager = ConcurrentStudentManager(data_file)
+    errors = []
+    stop = threading.Event()
+    
+    def writer(worker_id):
+        rng = random.Random(worker_id)
+        for i in range(students_per_writer):
+            student_id = f"{worker_id}-{i}"
+            manager.add_student(student_id, f"学生{student_id}", "高三", 17)
+            for subject in ("数学", "语文", "英语"):
+                manager.add_student_score(student_id, subject, rng.randint(0, 100))
+            if i % 10 == 9:
+                manager.remove_student(f"{worker_id}-{i - 5}")
+            if i % 100 == 99:
+                manager.save_data()
+    
+    def reader():
+        while not stop.is_set():
+            with manager.lock.read_locked():
+                stats = manager.get_class_statistics()
+                total = len(manager.students)
+                if isinstance(stats, dict) and stats["总学生数"] != total:
+                    errors.append(f"统计人数 {stats['总学生数']} 与名单人数 {total} 不一致")
+                if len(manager.index) != total:
+                    errors.append(f"索引人数 {len(manager.index)} 与名单人数 {total} 不一致")
+    
+    start = datetime.datetime.now()
+    with redirect_stdout(io.StringIO()):
+        readers = [threading.Thread(target=reader) for _ in range(reader_count)]
+        writers = [threading.Thread(target=writer, args=(i,)) for i in range(writer_count)]
+        for thread in readers + writers:
+            thread.start()
+        for thread in writers:
+            thread.join()
+        stop.set()
+        for thread in readers:
+            thread.join()
+        manager.save_data()
+        reloaded = StudentManager(data_file)
+    elapsed = (datetime.datetime.now() - start).total_seconds()
+    
+    expected = writer_count * (students_per_writer - students_per_writer // 10)
+    if len(manager.students) != expected:
+        errors.append(f"最终人数 {len(manager.students)}，应为 {expected}")
+    if manager.get_class_statistics() != manager.get_class_statistics(recompute=True):
+        errors.append("增量统计与重新计算的结果不一致")
+    if reloaded.get_class_statistics() != manager.get_class_statistics():
+        errors.append("保存后重新加载的数据与内存中不一致")
+    
+    print(f"写线程 {writer_count} 个，读线程 {reader_count} 个，耗时 {elapsed:.2f} 秒")
+    if errors:
+        print(f"❌ 发现 {len(errors)} 处不一致，例如：{errors[0]}")
+        return False
+    print(f"✅ 数据始终一致，最终共 {len(manager.students)} 名学生")
+    return True
+
+def service_benchmark(request_count=20000, concurrency=50):
+    """本地回环压测：启动服务，用多个 keep-alive 连接混合发送读写请求，报告每秒请求数"""
+    import random
+    import tempfile
+    
+    async def run():
+        data_file = os.path.join(tempfile.mkdtemp(), "service_students.json")
+        with redirect_stdout(io.StringIO()):
+            manager = ConcurrentStudentManager(data_file)
+        service = await StudentService(manager, port=0, save_interval=0.5).start()
+        
+        async def client(client_id, count):
+            rng = random.Random(client_id)
+            reader, writer = await asyncio.open_connection("127.0.0.1", service.port)
+            for i in range(count):
+                student_id = f"{client_id}-{i // 4}"
+                kind = i % 4
+                if kind == 0:
+                    await _http_request(reader, writer, "POST", "/students", {
+                        "student_id": student_id, "name": f"学生{student_id}",
+                        "grade": "高三", "age": 17})
+                elif kind == 1:
+                    await _http_request(reader, writer, "POST", f"/students/{student_id}/scores",
+                                        {"subject": "数学", "score": rng.randint(0, 100)})
+                elif kind == 2:
+                    await _http_request(reader, writer, "GET", f"/students/{student_id}")
+                else:
+                    await _http_request(reader, writer, "GET", "/statistics")
+            writer.close()
+        
+        per_client = request_count // concurrency
+        start = datetime.datetime.now()
+        await asyncio.gather(*(client(i, per_client) for i in range(concurrency)))
+        elapsed = (datetime.datetime.now() - start).total_seconds()
+        await service.stop()
+        return per_client * concurrency, elapsed, service.metrics
+    
+    print("🌐 本地JSON服务压测")
+    total, elapsed, metrics = asyncio.run(run())
+    print(f"请求数 {total}，并发连接 {concurrency}，耗时 {elapsed:.2f} 秒，"
+          f"约 {total / elapsed:.0f} 请求/秒")
+    print(f"写操作 {metrics['mutations']} 次，合并为 {metrics['batches']} 批，"
+          f"保存 {metrics['saves']} 次")
+    return total / elapsed
@@ -0,0 +1,348 @@
+# -*- coding: utf-8 -*-
+"""修改记录：追加写日志、变更流和成绩历史"""
+
+import os
+import json
+import datetime
+import threading
+import time
+from collections import deque
+from itertools import islice
+from pathlib import Path
+
+from .models import EPOCH
+
+class MutationJournal:
+    """追加写日志（write-ahead journal）：每次修改只追加一行JSON，而不是重写整个数据文件"""
+    
+    def __init__(self, journal_file, sync=False):
+        self.journal_file = journal_file
+        self.sync = sync  # 为True时每条记录都fsync，更安全但更慢
+        self.entry_count = 0
+        self._file = None
+    
+    def append(self, record):
+        """追加一条修改记录"""
+        if self._file is None:
+            self._file = open(self.journal_file, 'a', encoding='utf-8')
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        if self.sync:
+            os.fsync(self._file.fileno())
+        self.entry_count += 1
+    
+    def replay(self):
+        """逐条读出日志记录（生成器）"""
+        self.entry_count = 0
+        if not Path(self.journal_file).exists():
+            return
+        with open(self.journal_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # 进程崩溃时最后一行可能只写了一半，忽略即可
+                    continue
+                self.entry_count += 1
+                yield record
+    
+    def flush(self):
+        """把缓冲区内容落盘"""
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+    
+    def truncate(self):
+        """清空日志（在快照写入成功之后调用）"""
+        self.close()
+        open(self.journal_file, 'w', encoding='utf-8').close()
+        self.entry_count = 0
+    
+    def close(self):
+        """关闭日志文件"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+class ChangeFeed:
+    """变更流：给每次添加、删除、成绩修改分配单调递增的序号
+    
+    最近 capacity 条变更保存在内存里，可以按“某序号之后的变更”拉取，也可以订阅实时推送；
+    指定 feed_file 时变更同时追加到 JSON Lines 文件，重启后序号继续递增；
+    没有历史时序号从当前时间（微秒）开始，避免与上一次运行发出的序号混淆。
+    """
+    
+    def __init__(self, capacity=100000, feed_file=None):
+        self.events = deque(maxlen=capacity)
+        self.last_seq = 0
+        self.feed_file = feed_file
+        self.subscribers = []
+        self._lock = threading.Lock()
+        self._file = None
+        if feed_file is not None and Path(feed_file).exists():
+            with open(feed_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # 崩溃时写了一半的最后一行
+                    self.events.append(event)
+                    self.last_seq = event["seq"]
+        if not self.events:
+            # 没有历史时以当前时间（微秒）作为起点，重启后的新序号不会落在旧序号范围里
+            self.last_seq = time.time_ns() // 1000
+        # 变更流开始时的序号：更早的状态无法从变更还原，只能全量导出
+        self.base_seq = self.events[0]["seq"] - 1 if self.events else self.last_seq
+    
+    def record(self, change):
+        """记录一次修改（作为 StudentManager 的监听者调用），返回带序号的事件"""
+        with self._lock:
+            self.last_seq += 1
+            event = {"seq": self.last_seq, "time": datetime.datetime.now().isoformat()}
+            event.update(change)
+            self.events.append(event)
+            if self.feed_file is not None:
+                if self._file is None:
+                    self._file = open(self.feed_file, 'a', encoding='utf-8')
+                self._file.write(json.dumps(event, ensure_ascii=False) + "\n")
+                self._file.flush()
+            subscribers = list(self.subscribers)
+        for callback in subscribers:
+            callback(event)
+        return event
+    
+    @property
+    def first_seq(self):
+        """内存中最早一条变更的序号（没有变更时为 last_seq + 1）"""
+        return self.events[0]["seq"] if self.events else self.last_seq + 1
+    
+    def changes_since(self, seq, limit=None):
+        """序号大于 seq 的变更列表；更早的变更已经被淘汰时抛出 LookupError"""
+        with self._lock:
+            if seq > self.last_seq:
+                return []
+            if seq + 1 < self.first_seq:
+                raise LookupError(f"序号 {seq} 之后的部分变更已被淘汰，需要全量导出")
+            # 序号连续，可以直接算出在队列中的位置
+            start = seq + 1 - self.first_seq
+            stop = None if limit is None else start + limit
+            return list(islice(self.events, start, stop))
+    
+    def subscribe(self, callback):
+        """订阅之后的每一个变更，返回取消订阅的函数"""
+        with self._lock:
+            self.subscribers.append(callback)
+        
+        def unsubscribe():
+            with self._lock:
+                if callback in self.subscribers:
+                    self.subscribers.remove(callback)
+        return unsubscribe
+    
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+def _append_varint(out, value):
+    """把有符号整数按 zigzag + varint 编码追加到 bytearray（小数值只占1个字节）"""
+    value = -2 * value - 1 if value < 0 else 2 * value
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def _read_varint(data, pos):
+    """从 pos 处读出一个 _append_varint 编码的整数，返回 (整数, 下一个位置)"""
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            break
+        shift += 7
+    return (value >> 1) ^ -(value & 1), pos
+
+class _ScoreSeries:
+    """一个 (学生, 科目) 的成绩历史：编码数据 + 最后一条的绝对值（追加时不必解码）"""
+
+    __slots__ = ("data", "last_seconds", "last_cents")
+
+    def __init__(self, data=b""):
+        self.data = bytearray(data)
+        self.last_seconds = self.last_cents = 0
+        for entry in ScoreHistory.entries(data):  # 从文件加载时解码一次，找到最后一条
+            self.last_seconds, self.last_cents = entry
+
+class ScoreHistory:
+    """成绩历史：记录每个学生每科成绩的每一次修改（时间精确到秒）
+
+    每个 (学生, 科目) 的历史是一段字节，依次保存 (时间差, 成绩差) 的 varint 编码：
+    第一条相对1970年和0分，之后每条相对上一条，成绩以0.01分为单位。
+    典型的一次修改只占3~6个字节；只有真正有成绩的学生才会占用空间。
+    另外记住最后一条的绝对值，追加和“最新成绩”查询都是O(1)。
+    可以作为 StudentManager 的监听者使用，见 enable_score_history。
+    """
+
+    def __init__(self, history_file=None):
+        self.series = {}  # 学号 -> {科目: _ScoreSeries}
+        self.history_file = history_file
+        self._lock = threading.Lock()
+        if history_file is not None and Path(history_file).exists():
+            with open(history_file, 'rb') as f:
+                self._decode_file(f.read())
+
+    @staticmethod
+    def entries(data):
+        """逐条解码一段历史（生成器），产生 (秒, 成绩的百分之一)"""
+        seconds = cents = pos = 0
+        while pos < len(data):
+            delta_seconds, pos = _read_varint(data, pos)
+            delta_cents, pos = _read_varint(data, pos)
+            seconds += delta_seconds
+            cents += delta_cents
+            yield seconds, cents
+
+    def _snapshot(self, student_id, subject):
+        """在锁内复制一段历史：(编码数据, 最后一条的秒, 最后一条的成绩)，没有记录时为None
+
+        record 逐字节追加 varint，读者只能读锁内复制出的完整数据。
+        """
+        with self._lock:
+            series = self.series.get(student_id, {}).get(subject)
+            if series is None:
+                return None
+            return bytes(series.data), series.last_seconds, series.last_cents
+
+    def record(self, student_id, subject, score, when=None):
+        """记录一次成绩修改，when 默认为当前时间"""
+        when = datetime.datetime.now() if when is None else when
+        seconds = (when - EPOCH) // datetime.timedelta(seconds=1)
+        cents = round(score * 100)
+        with self._lock:
+            subjects = self.series.setdefault(student_id, {})
+            series = subjects.get(subject)
+            if series is None:
+                series = subjects[subject] = _ScoreSeries()
+            _append_varint(series.data, seconds - series.last_seconds)
+            _append_varint(series.data, cents - series.last_cents)
+            series.last_seconds, series.last_cents = seconds, cents
+
+    def seed(self, students, when=None):
+        """把学生当前的成绩记为历史的起点（开启历史之前的修改时间已无从得知，记为 when）
+
+        与该科最后一条记录相同的成绩不重复记录，例如从 history_file 加载后再次开启。
+        """
+        when = datetime.datetime.now() if when is None else when
+        for student in students:
+            for subject, score in student.subjects.items():
+                snapshot = self._snapshot(student.student_id, subject)
+                if snapshot is None or snapshot[2] != round(score * 100):
+                    self.record(student.student_id, subject, score, when)
+
+    def forget(self, student_id):
+        """删除一个学生的全部历史"""
+        with self._lock:
+            self.series.pop(student_id, None)
+
+    def on_change(self, record):
+        """作为 StudentManager 的监听者：记录成绩修改，学生被删除时丢弃其历史"""
+        op = record.get("op")
+        if op == "score":
+            self.record(record["student_id"], record["subject"], record["score"])
+        elif op == "add":
+            student = record["student"]
+            for subject, score in student.get("subjects", {}).items():
+                self.record(student["student_id"], subject, score)
+        elif op == "remove":
+            self.forget(record["student_id"])
+
+    def history(self, student_id, subject):
+        """某生某科的全部修改，[(时间, 成绩), ...]，从早到晚"""
+        snapshot = self._snapshot(student_id, subject)
+        if snapshot is None:
+            return []
+        return [(EPOCH + datetime.timedelta(seconds=seconds), cents / 100)
+                for seconds, cents in self.entries(snapshot[0])]
+
+    def score_as_of(self, student_id, subject, when):
+        """时刻 when 时的成绩，那时还没有成绩则为None
+
+        when 不早于最后一次修改时直接返回最新成绩（O(1)）；
+        否则从头解码，越过 when 就停止，只需要读 when 之前的修改。
+        """
+        snapshot = self._snapshot(student_id, subject)
+        if snapshot is None:
+            return None
+        data, last_seconds, last_cents = snapshot
+        seconds = (when - EPOCH) // datetime.timedelta(seconds=1)
+        if seconds >= last_seconds:
+            return last_cents / 100
+        result = None
+        for entry_seconds, cents in self.entries(data):
+            if entry_seconds > seconds:
+                break
+            result = cents / 100  # 同一秒内多次修改时取最后一次
+        return result
+
+    def trend(self, student_id, subject, since=None):
+        """成绩趋势：修改次数、首末成绩、总变化和最小二乘拟合的每天变化，没有记录时为None"""
+        entries = self.history(student_id, subject)
+        if since is not None:
+            entries = [(when, score) for when, score in entries if when >= since]
+        if not entries:
+            return None
+        days = [(when - entries[0][0]) / datetime.timedelta(days=1) for when, _ in entries]
+        scores = [score for _, score in entries]
+        mean_day, mean_score = sum(days) / len(days), sum(scores) / len(scores)
+        spread = sum((day - mean_day) ** 2 for day in days)
+        slope = (sum((day - mean_day) * (score - mean_score) for day, score in zip(days, scores))
+                 / spread if spread else 0.0)
+        return {
+            "revisions": len(entries),
+            "first": scores[0],
+            "last": scores[-1],
+            "change": round(scores[-1] - scores[0], 2),
+            "per_day": round(slope, 4),
+        }
+
+    def encoded_size(self):
+        """全部历史编码后的字节数"""
+        with self._lock:
+            return sum(len(series.data) for subjects in self.series.values()
+                       for series in subjects.values())
+
+    def _decode_file(self, payload):
+        pos = 0
+        while pos < len(payload):
+            strings = []
+            for _ in range(2):
+                length, pos = _read_varint(payload, pos)
+                strings.append(payload[pos:pos + length].decode('utf-8'))
+                pos += length
+            length, pos = _read_varint(payload, pos)
+            self.series.setdefault(strings[0], {})[strings[1]] = _ScoreSeries(
+                payload[pos:pos + length])
+            pos += length
+
+    def flush(self):
+        """写入 history_file（原子替换）；每条是 学号、科目、历史 三段带长度前缀的数据"""
+        if self.history_file is None:
+            return
+        out = bytearray()
+        with self._lock:
+            for student_id, subjects in self.series.items():
+                for subject, series in subjects.items():
+                    for part in (str(student_id).encode('utf-8'), subject.encode('utf-8'),
+                                 series.data):
+                        _append_varint(out, len(part))
+                        out += part
+        tmp_file = self.history_file + ".tmp"
+        with open(tmp_file, 'wb') as f:
+            f.write(out)
+        os.replace(tmp_file, self.history_file)
@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+"""并发：读写锁、线程安全的管理器和后台自动保存"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+from .query import StudentQuery
+from .manager import StudentManager
+
+class ReadWriteLock:
+    """读写锁：多个读者可以同时持有，写者独占；同一线程内可重入，有写者排队时新读者等待"""
+    
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writer = None  # 持有写锁的线程
+        self._waiting_writers = 0
+        self._local = threading.local()
+    
+    def acquire_read(self):
+        me = threading.get_ident()
+        if self._writer == me:
+            return  # 写者内部的读操作直接放行
+        depth = getattr(self._local, "read_depth", 0)
+        if not depth:
+            with self._cond:
+                while self._writer is not None or self._waiting_writers:
+                    self._cond.wait()
+                self._readers += 1
+        self._local.read_depth = depth + 1
+    
+    def release_read(self):
+        if self._writer == threading.get_ident():
+            return
+        self._local.read_depth -= 1
+        if not self._local.read_depth:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+    
+    def acquire_write(self):
+        me = threading.get_ident()
+        if self._writer == me:
+            self._local.write_depth += 1
+            return
+        if getattr(self._local, "read_depth", 0):
+            raise RuntimeError("持有读锁时不能再申请写锁")
+        with self._cond:
+            self._waiting_writers += 1
+            while self._writer is not None or self._readers:
+                self._cond.wait()
+            self._waiting_writers -= 1
+            self._writer = me
+        self._local.write_depth = 1
+    
+    def release_write(self):
+        self._local.write_depth -= 1
+        if not self._local.write_depth:
+            with self._cond:
+                self._writer = None
+                self._cond.notify_all()
+    
+    @contextmanager
+    def read_locked(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+    
+    @contextmanager
+    def write_locked(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+def _read_locked(method):
+    """让方法在读锁保护下执行"""
+    def wrapper(self, *args, **kwargs):
+        with self.lock.read_locked():
+            return method(self, *args, **kwargs)
+    wrapper.__name__ = method.__name__
+    wrapper.__doc__ = method.__doc__
+    return wrapper
+
+def _write_locked(method):
+    """让方法在写锁保护下执行"""
+    def wrapper(self, *args, **kwargs):
+        with self.lock.write_locked():
+            return method(self, *args, **kwargs)
+    wrapper.__name__ = method.__name__
+    wrapper.__doc__ = method.__doc__
+    return wrapper
+
+class LockedStudentQuery(StudentQuery):
+    """ConcurrentStudentManager 的查询：执行和说明都在管理器的读锁下进行"""
+    
+    @property
+    def lock(self):
+        return self.manager.lock
+    
+    explain = _read_locked(StudentQuery.explain)
+    all = _read_locked(StudentQuery.all)
+
+class ConcurrentStudentManager(StudentManager):
+    """线程安全的学生管理系统：查询在读锁下并行，修改在写锁下串行
+    
+    save_data 持有读锁（写者无法在保存过程中修改名单），
+    再用一把单独的互斥锁保证同一时刻只有一个线程在写文件。
+    """
+    
+    def __init__(self, *args, **kwargs):
+        self.lock = ReadWriteLock()
+        self._save_lock = threading.Lock()
+        super().__init__(*args, **kwargs)
+    
+    def save_data(self, quiet=False):
+        """保存学生数据到文件（先在写锁下清理墓碑，再在读锁下保存）"""
+        with self.lock.write_locked():
+            self._compact_roster()
+        with self.lock.read_locked(), self._save_lock:
+            return super().save_data(quiet)
+    
+    def _compact_for_save(self):
+        """读锁下不修改名单；保存期间新留下的墓碑由视图跳过"""
+    
+    def query(self):
+        """创建一个在读锁下执行的查询，见 LockedStudentQuery"""
+        return LockedStudentQuery(self)
+    
+    def export_changes(self, since_seq=0):
+        """增量导出（读锁下进行，保证序号和名单一致）"""
+        if self.change_feed is None:
+            self.enable_change_feed()  # 需要写锁，必须在获取读锁之前
+        with self.lock.read_locked():
+            return super().export_changes(since_seq)
+    
+    def search_students(self, text, limit=20):
+        """按部分姓名搜索（读锁下进行）"""
+        if self.name_search is None:
+            self.enable_name_search()  # 需要写锁，必须在获取读锁之前
+        with self.lock.read_locked():
+            return super().search_students(text, limit)
+    
+    enable_change_feed = _write_locked(StudentManager.enable_change_feed)
+    enable_name_search = _write_locked(StudentManager.enable_name_search)
+    enable_score_history = _write_locked(StudentManager.enable_score_history)
+    
+    load_data = _write_locked(StudentManager.load_data)
+    compact = _write_locked(StudentManager.compact)
+    add_student = _write_locked(StudentManager.add_student)
+    remove_student = _write_locked(StudentManager.remove_student)
+    remove_students_where = _write_locked(StudentManager.remove_students_where)
+    add_student_score = _write_locked(StudentManager.add_student_score)
+    
+    find_student = _read_locked(StudentManager.find_student)
+    find_students_by = _read_locked(StudentManager.find_students_by)
+    get_top_students = _read_locked(StudentManager.get_top_students)
+    get_bottom_students = _read_locked(StudentManager.get_bottom_students)
+    get_student_rank = _read_locked(StudentManager.get_student_rank)
+    get_subject_average = _read_locked(StudentManager.get_subject_average)
+    get_subject_top_students = _read_locked(StudentManager.get_subject_top_students)
+    get_students_below = _read_locked(StudentManager.get_students_below)
+    show_all_students = _read_locked(StudentManager.show_all_students)
+    show_student_detail = _read_locked(StudentManager.show_student_detail)
+    get_class_statistics = _read_locked(StudentManager.get_class_statistics)
+    get_score_percentiles = _read_locked(StudentManager.get_score_percentiles)
+    get_score_histogram = _read_locked(StudentManager.get_score_histogram)
+    # 并行统计只在读锁下拍快照，进程池计算期间不阻塞写者
+    _statistics_rows = _read_locked(StudentManager._statistics_rows)
+    # 批量导入时读文件和进程池解析都不持锁，只有合并进名单时才获取写锁
+    _merge_import = _write_locked(StudentManager._merge_import)
+
+class AutoSaver:
+    """自动保存：每次修改只把管理器标记为“脏”，由后台线程把一段时间内的多次修改合并成一次保存
+    
+    第一次修改后等待 delay 秒，或累计 max_ops 次修改时立即保存；JSON文件通过
+    “临时文件 + fsync + 重命名”原子写入。后台线程保存时要和修改互斥，所以只接受
+    ConcurrentStudentManager：保存过程持有读锁，不会写出修改到一半的名单。
+    """
+    
+    def __init__(self, manager, delay=2.0, max_ops=100, on_saved=None):
+        if not isinstance(manager, ConcurrentStudentManager):
+            raise ValueError("AutoSaver 需要 ConcurrentStudentManager")
+        self.manager = manager
+        self.delay = delay
+        self.max_ops = max_ops
+        self.on_saved = on_saved  # 回调 on_saved(耗时秒数, 是否成功)
+        self.save_count = 0
+        self.last_latency = None
+        self.max_latency = 0.0
+        self._dirty_ops = 0
+        self._first_dirty = None
+        self._stopped = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+        manager.listeners.append(self.mark_dirty)
+    
+    def start(self):
+        self._thread.start()
+        return self
+    
+    def mark_dirty(self, record=None):
+        """记录一次修改"""
+        with self._cond:
+            self._dirty_ops += 1
+            if self._first_dirty is None:
+                self._first_dirty = time.monotonic()
+            self._cond.notify()
+    
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    if not self._dirty_ops:
+                        self._cond.wait()
+                        continue
+                    remaining = self.delay - (time.monotonic() - self._first_dirty)
+                    if self._dirty_ops >= self.max_ops or remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._stopped and not self._dirty_ops:
+                    return
+                self._dirty_ops = 0
+                self._first_dirty = None
+            self._save()
+    
+    def _save(self):
+        start = time.perf_counter()
+        ok = self.manager.save_data(quiet=True)
+        latency = time.perf_counter() - start
+        self.save_count += 1
+        self.last_latency = latency
+        self.max_latency = max(self.max_latency, latency)
+        if self.on_saved is not None:
+            self.on_saved(latency, ok)
+    
+    def report(self):
+        """自动保存情况的简要说明"""
+        if not self.save_count:
+            return "自动保存：尚未触发"
+        return (f"自动保存：共 {self.save_count} 次，最近一次耗时 {self.last_latency * 1000:.1f} 毫秒，"
+                f"最长 {self.max_latency * 1000:.1f} 毫秒")
+    
+    def stop(self):
+        """停止后台线程；还有未保存的修改时先保存再退出"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        self._thread.join()
+        self.manager.listeners.remove(self.mark_dirty)
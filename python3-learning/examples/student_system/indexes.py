@@ -0,0 +1,667 @@
+# -*- coding: utf-8 -*-
+"""索引和增量统计结构：学号/二级索引、姓名搜索、列式成绩、排行榜、直方图、科目成绩索引"""
+
+import bisect
+import heapq
+from array import array
+from collections import Counter
+from itertools import chain
+
+try:
+    import numpy as np  # 可选依赖：安装后列式统计会使用向量化计算
+except ImportError:
+    np = None
+
+from .models import GRADE_LEVELS, grade_level_of
+
+class StudentIndex:
+    """学生索引：按学号的主索引 + 可选的二级索引（如年级、姓名）"""
+    
+    def __init__(self, secondary_fields=("grade", "name")):
+        self.by_id = {}  # 学号 -> 学生
+        # 二级索引：字段 -> {字段值 -> {学号 -> 学生}}，内层字典保持插入顺序且删除为O(1)
+        self.secondary = {field: {} for field in secondary_fields}
+    
+    def add(self, student):
+        """把学生加入所有索引"""
+        self.by_id[student.student_id] = student
+        for field, index in self.secondary.items():
+            index.setdefault(getattr(student, field), {})[student.student_id] = student
+    
+    def remove(self, student):
+        """把学生从所有索引中移除"""
+        self.by_id.pop(student.student_id, None)
+        for field, index in self.secondary.items():
+            key = getattr(student, field)
+            bucket = index.get(key)
+            if bucket is not None:
+                bucket.pop(student.student_id, None)
+                if not bucket:
+                    del index[key]
+    
+    def get(self, student_id):
+        """按学号查找，O(1)"""
+        return self.by_id.get(student_id)
+    
+    def find_by(self, field, value):
+        """按二级索引字段查找，返回学生列表"""
+        if field not in self.secondary:
+            raise KeyError(f"字段 {field} 没有建立索引")
+        return list(self.secondary[field].get(value, {}).values())
+    
+    def rebuild(self, students):
+        """根据学生列表重建全部索引"""
+        self.by_id.clear()
+        for index in self.secondary.values():
+            index.clear()
+        for student in students:
+            self.add(student)
+    
+    def __len__(self):
+        return len(self.by_id)
+    
+    def __contains__(self, student_id):
+        return student_id in self.by_id
+
+def _within_one_edit(a, b):
+    """两个字符串能否通过一次插入、删除、替换或相邻交换变成一样"""
+    if abs(len(a) - len(b)) > 1:
+        return False
+    i = 0
+    while i < min(len(a), len(b)) and a[i] == b[i]:
+        i += 1
+    if len(a) > len(b):
+        return a[i + 1:] == b[i:]
+    if len(a) < len(b):
+        return a[i:] == b[i + 1:]
+    if a[i + 1:] == b[i + 1:]:
+        return True  # 相同，或只有第i个字不同
+    return a[i] == b[i + 1] and a[i + 1] == b[i] and a[i + 2:] == b[i + 2:]
+
+class NameSearchIndex:
+    """姓名搜索索引：支持前缀、子串和容错（编辑距离1）查找，中文姓名按单字和双字切分
+
+    - grams：单字和双字倒排表，姓名前后加边界符，前缀查找即查带开头边界符的双字
+    - deletions：“删掉一个字后的姓名”表，查询词和姓名各自删字后能对上，才可能只差一个字
+    - 完整姓名直接查 StudentIndex 的姓名二级索引（by_name），没有时才自己维护一份
+    每次查找只访问与查询词长度相关的几张倒排表，并在凑够 limit 条后停止。
+    """
+
+    START, END = "\x02", "\x03"
+
+    def __init__(self, by_name=None):
+        self.grams = {}      # 单字/双字 -> {学号: 学生}
+        self.deletions = {}  # 删掉一个字后的姓名 -> {学号: 学生}
+        self._owns_names = by_name is None
+        self.by_name = {} if by_name is None else by_name  # 姓名 -> {学号: 学生}
+
+    @staticmethod
+    def normalize(name):
+        return name.strip().casefold()
+
+    def _grams(self, name):
+        padded = self.START + name + self.END
+        return set(name) | {padded[i:i + 2] for i in range(len(padded) - 1)}
+
+    @staticmethod
+    def _deletions(name):
+        return {name[:i] + name[i + 1:] for i in range(len(name))}
+
+    def _tables(self, name):
+        tables = [(self.grams, self._grams(name)), (self.deletions, self._deletions(name))]
+        if self._owns_names:
+            tables.append((self.by_name, (name,)))
+        return tables
+
+    def add(self, student):
+        for table, keys in self._tables(self.normalize(student.name)):
+            for key in keys:
+                table.setdefault(key, {})[student.student_id] = student
+
+    def remove(self, student):
+        for table, keys in self._tables(self.normalize(student.name)):
+            for key in keys:
+                bucket = table.get(key)
+                if bucket is not None:
+                    bucket.pop(student.student_id, None)
+                    if not bucket:
+                        del table[key]
+
+    def rebuild(self, students):
+        self.grams.clear()
+        self.deletions.clear()
+        if self._owns_names:
+            self.by_name.clear()
+        for student in students:
+            self.add(student)
+
+    def _intersect(self, keys, accept, limit):
+        """遍历最短的倒排表，其余倒排表只做成员检查，accept 通过的学生凑够 limit 条即停止"""
+        buckets = sorted((self.grams.get(key, {}) for key in keys), key=len)
+        result = []
+        for student_id, student in buckets[0].items():
+            if all(student_id in bucket for bucket in buckets[1:]) and accept(student):
+                result.append(student)
+                if len(result) == limit:
+                    break
+        return result
+
+    def prefix(self, text, limit=20):
+        """姓名以 text 开头的学生"""
+        text = self.normalize(text)
+        if not text:
+            return []
+        padded = self.START + text
+        keys = {padded[i:i + 2] for i in range(len(padded) - 1)}
+        return self._intersect(keys, lambda s: self.normalize(s.name).startswith(text), limit)
+
+    def contains(self, text, limit=20):
+        """姓名包含 text 的学生"""
+        text = self.normalize(text)
+        if not text:
+            return []
+        keys = {text} if len(text) == 1 else {text[i:i + 2] for i in range(len(text) - 1)}
+        return self._intersect(keys, lambda s: text in self.normalize(s.name), limit)
+
+    def fuzzy(self, text, limit=20):
+        """与 text 最多差一个字（插入、删除、替换或相邻交换）的学生，完全相同的排在前面"""
+        raw = text.strip()
+        text = self.normalize(raw)
+        if not text or limit <= 0:
+            return []
+        deletions = self._deletions(text)
+        # 共享的姓名索引以原始姓名为键，原样和规范化后的查询词都查一遍
+        names = (raw, text) if raw != text else (text,)
+        name_deletions = set().union(*(self._deletions(name) for name in names))
+        # 依次是：同名、多一个字、少一个字（这三类一定符合），最后是需要核对的替换/交换
+        sources = chain(((self.by_name.get(name, {}), False) for name in names),
+                        [(self.deletions.get(text, {}), False)],
+                        ((self.by_name.get(key, {}), False) for key in name_deletions),
+                        ((self.deletions.get(key, {}), True) for key in deletions))
+        result, seen = [], set()
+        for bucket, verify in sources:
+            for student_id, student in bucket.items():
+                if student_id in seen:
+                    continue
+                if verify and not _within_one_edit(text, self.normalize(student.name)):
+                    continue
+                seen.add(student_id)
+                result.append(student)
+                if len(result) == limit:
+                    return result
+        return result
+
+class ColumnarScoreStore:
+    """列式成绩存储：学号列 + 科目字典 + 按科目分列的稠密成绩矩阵（附缺失掩码）"""
+    
+    def __init__(self):
+        self.student_ids = []   # 行号 -> 学号
+        self.rows = {}          # 学号 -> 行号
+        self.subjects = []      # 列号 -> 科目
+        self.subject_ids = {}   # 科目 -> 列号
+        self.scores = []        # 每个科目一列 array('d')，缺失处为0
+        self.masks = []         # 每个科目一列 array('b')，1 表示有成绩
+    
+    def __len__(self):
+        return len(self.student_ids)
+    
+    def add_student(self, student):
+        """追加一行"""
+        self.rows[student.student_id] = len(self.student_ids)
+        self.student_ids.append(student.student_id)
+        for column, mask in zip(self.scores, self.masks):
+            column.append(0.0)
+            mask.append(0)
+        for subject, score in student.subjects.items():
+            self.set_score(student.student_id, subject, score)
+    
+    def remove_student(self, student_id):
+        """删除一行：用最后一行填补空位，避免整体移动"""
+        row = self.rows.pop(student_id, None)
+        if row is None:
+            return
+        last = len(self.student_ids) - 1
+        if row != last:
+            moved_id = self.student_ids[last]
+            self.student_ids[row] = moved_id
+            self.rows[moved_id] = row
+            for column, mask in zip(self.scores, self.masks):
+                column[row] = column[last]
+                mask[row] = mask[last]
+        self.student_ids.pop()
+        for column, mask in zip(self.scores, self.masks):
+            column.pop()
+            mask.pop()
+    
+    def set_score(self, student_id, subject, score):
+        """写入一个成绩，遇到新科目时新增一列"""
+        col = self.subject_ids.get(subject)
+        if col is None:
+            col = len(self.subjects)
+            self.subject_ids[subject] = col
+            self.subjects.append(subject)
+            n = len(self.student_ids)
+            self.scores.append(array('d', bytes(8 * n)))
+            self.masks.append(array('b', bytes(n)))
+        row = self.rows[student_id]
+        self.scores[col][row] = score
+        self.masks[col][row] = 1
+    
+    def rebuild(self, students):
+        """根据学生列表重建整个存储"""
+        self.__init__()
+        for student in students:
+            self.add_student(student)
+    
+    def averages(self):
+        """每个学生的平均分（按行号），没有成绩的学生为0"""
+        n = len(self.student_ids)
+        if np is not None:
+            if not self.scores:
+                return np.zeros(n)
+            matrix = np.vstack([np.frombuffer(column, dtype=np.float64) for column in self.scores])
+            counts = np.vstack([np.frombuffer(mask, dtype=np.int8) for mask in self.masks]).sum(axis=0)
+            sums = matrix.sum(axis=0)
+            avgs = np.divide(sums, counts, out=np.zeros(n), where=counts > 0)
+            return np.round(avgs, 2)
+        # 没有NumPy时逐列累加，仍然只遍历紧凑的数组而不是学生对象
+        sums = [0.0] * n
+        counts = [0] * n
+        for column, mask in zip(self.scores, self.masks):
+            sums = [a + b for a, b in zip(sums, column)]
+            counts = [a + b for a, b in zip(counts, mask)]
+        return [round(total / count, 2) if count else 0 for total, count in zip(sums, counts)]
+    
+    def statistics(self):
+        """与 StudentManager.get_class_statistics 相同格式的统计结果"""
+        if not self.student_ids:
+            return "暂无数据"
+        avgs = self.averages()
+        if np is not None:
+            valid = avgs[avgs > 0]
+            if valid.size == 0:
+                return "暂无有效成绩数据"
+            class_average = round(float(valid.mean()), 2)
+            highest_score, lowest_score = float(valid.max()), float(valid.min())
+            excellent = int((valid >= 90).sum())
+            good = int((valid >= 80).sum()) - excellent
+            passed = int((valid >= 60).sum()) - excellent - good
+            weak = int(valid.size) - excellent - good - passed
+            grade_counts = dict(zip(GRADE_LEVELS, (excellent, good, passed, weak)))
+        else:
+            valid = [avg for avg in avgs if avg > 0]
+            if not valid:
+                return "暂无有效成绩数据"
+            class_average = round(sum(valid) / len(valid), 2)
+            highest_score, lowest_score = max(valid), min(valid)
+            grade_counts = {level: 0 for level in GRADE_LEVELS}
+            for avg in valid:
+                grade_counts[grade_level_of(avg)] += 1
+        return {
+            "总学生数": len(self.student_ids),
+            "班级平均分": class_average,
+            "最高分": highest_score,
+            "最低分": lowest_score,
+            "等级分布": grade_counts
+        }
+
+class ClassAggregates:
+    """增量维护的班级统计：人数、平均分总和、等级分布，以及支持删除的最高/最低分"""
+    
+    def __init__(self):
+        self.count = 0        # 有有效成绩（平均分>0）的学生数
+        self.total_cents = 0  # 平均分之和，以“分×100”的整数保存，避免浮点误差累积
+        self.grade_counts = {level: 0 for level in GRADE_LEVELS}
+        self._live = Counter()  # 平均分 -> 人数
+        self._min_heap = []
+        self._max_heap = []     # 存负数，实现最大堆
+    
+    def add(self, avg):
+        """加入一个学生的平均分"""
+        if avg <= 0:
+            return
+        self.count += 1
+        self.total_cents += round(avg * 100)
+        self.grade_counts[grade_level_of(avg)] += 1
+        if self._live[avg] == 0:
+            heapq.heappush(self._min_heap, avg)
+            heapq.heappush(self._max_heap, -avg)
+        self._live[avg] += 1
+    
+    def discard(self, avg):
+        """移除一个学生的平均分（堆中的旧值延迟删除）"""
+        if avg <= 0:
+            return
+        self.count -= 1
+        self.total_cents -= round(avg * 100)
+        self.grade_counts[grade_level_of(avg)] -= 1
+        self._live[avg] -= 1
+        if self._live[avg] == 0:
+            del self._live[avg]
+            # 堆中失效的值太多时整体重建，防止无限增长
+            if len(self._min_heap) > 2 * len(self._live) + 64:
+                self._min_heap = list(self._live)
+                heapq.heapify(self._min_heap)
+                self._max_heap = [-avg for avg in self._live]
+                heapq.heapify(self._max_heap)
+            # 在写操作里清理堆顶的失效值，读操作只需查看堆顶，多个读者并发时也不会修改堆
+            while self._min_heap and self._min_heap[0] not in self._live:
+                heapq.heappop(self._min_heap)
+            while self._max_heap and -self._max_heap[0] not in self._live:
+                heapq.heappop(self._max_heap)
+    
+    def rebuild(self, students):
+        """根据学生列表重新计算"""
+        self.__init__()
+        for student in students:
+            self.add(student.get_average())
+    
+    def lowest(self):
+        """当前最低平均分，O(1)"""
+        return self._min_heap[0] if self._min_heap else None
+    
+    def highest(self):
+        """当前最高平均分，O(1)"""
+        return -self._max_heap[0] if self._max_heap else None
+    
+    def statistics(self, total_students):
+        """与 StudentManager.get_class_statistics 相同格式的统计结果"""
+        if not total_students:
+            return "暂无数据"
+        if not self.count:
+            return "暂无有效成绩数据"
+        return {
+            "总学生数": total_students,
+            "班级平均分": round(self.total_cents / self.count / 100, 2),
+            "最高分": self.highest(),
+            "最低分": self.lowest(),
+            "等级分布": dict(self.grade_counts)
+        }
+
+class Leaderboard:
+    """排行榜：平均分按0.01分桶，用树状数组维护各分数段人数，名次查询为O(log n)"""
+    
+    SIZE = 10001  # 0.00 ~ 100.00 分共10001个桶
+    
+    def __init__(self):
+        self.tree = [0] * (self.SIZE + 1)  # 树状数组，下标从1开始
+        self.buckets = {}   # 桶号 -> {学号: 学生}
+        self.position = {}  # 学号 -> 桶号
+    
+    def __len__(self):
+        return len(self.position)
+    
+    def _update_tree(self, bucket, delta):
+        i = bucket + 1
+        while i <= self.SIZE:
+            self.tree[i] += delta
+            i += i & -i
+    
+    def _count_upto(self, bucket):
+        """平均分所在桶号 <= bucket 的人数"""
+        i = bucket + 1
+        total = 0
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+    
+    def _kth_bucket(self, k):
+        """从低到高第k名（从1开始）所在的桶号"""
+        pos = 0
+        step = 1 << self.SIZE.bit_length()
+        while step:
+            nxt = pos + step
+            if nxt <= self.SIZE and self.tree[nxt] < k:
+                pos = nxt
+                k -= self.tree[nxt]
+            step >>= 1
+        return pos  # 树状数组下标 pos+1 对应桶号 pos
+    
+    def add(self, student):
+        """加入学生"""
+        bucket = round(student.get_average() * 100)
+        self.position[student.student_id] = bucket
+        self.buckets.setdefault(bucket, {})[student.student_id] = student
+        self._update_tree(bucket, 1)
+    
+    def discard(self, student_id):
+        """移除学生"""
+        bucket = self.position.pop(student_id, None)
+        if bucket is None:
+            return
+        members = self.buckets[bucket]
+        del members[student_id]
+        if not members:
+            del self.buckets[bucket]
+        self._update_tree(bucket, -1)
+    
+    def update(self, student):
+        """学生平均分变化后调整位置"""
+        bucket = round(student.get_average() * 100)
+        if self.position.get(student.student_id) != bucket:
+            self.discard(student.student_id)
+            self.add(student)
+    
+    def rebuild(self, students):
+        """根据学生列表重建"""
+        self.__init__()
+        for student in students:
+            self.add(student)
+    
+    def top(self, n):
+        """平均分最高的n名学生"""
+        result = []
+        while len(result) < min(n, len(self)):
+            bucket = self._kth_bucket(len(self) - len(result))
+            for student in self.buckets[bucket].values():
+                result.append(student)
+                if len(result) == n:
+                    break
+        return result
+    
+    def bottom(self, n):
+        """平均分最低的n名学生"""
+        result = []
+        while len(result) < min(n, len(self)):
+            bucket = self._kth_bucket(len(result) + 1)
+            for student in self.buckets[bucket].values():
+                result.append(student)
+                if len(result) == n:
+                    break
+        return result
+    
+    def rank(self, student_id):
+        """返回 (名次, 百分位)；名次 = 1 + 平均分严格更高的人数，百分位 = 平均分不高于该生的人数占比"""
+        bucket = self.position.get(student_id)
+        if bucket is None:
+            return None
+        at_or_below = self._count_upto(bucket)
+        return len(self) - at_or_below + 1, round(at_or_below / len(self) * 100, 2)
+
+class ScoreHistogram:
+    """固定分箱的成绩直方图：支持增删、常数时间的百分位查询，并且可以直接相加合并
+    
+    0~100分按 resolution 分箱（默认0.5分一箱，共201箱），百分位误差不超过一个箱宽。
+    """
+    
+    def __init__(self, resolution=0.5, counts=None):
+        self.resolution = resolution
+        self.bin_count = int(round(100 / resolution)) + 1
+        self.counts = list(counts) if counts is not None else [0] * self.bin_count
+        self.total = sum(self.counts)
+    
+    def _bin(self, score):
+        return min(int(score / self.resolution + 1e-9), self.bin_count - 1)
+    
+    def add(self, score, count=1):
+        self.counts[self._bin(score)] += count
+        self.total += count
+    
+    def discard(self, score):
+        self.add(score, -1)
+    
+    def merge(self, other):
+        """把另一个直方图合并进来（分箱必须相同）"""
+        if other.resolution != self.resolution:
+            raise ValueError("分箱宽度不同的直方图不能合并")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.total += other.total
+        return self
+    
+    @classmethod
+    def merged(cls, sketches, resolution=0.5):
+        """合并多个直方图（例如多个分片或多个文件）"""
+        result = cls(resolution)
+        for sketch in sketches:
+            result.merge(sketch)
+        return result
+    
+    def percentile(self, p):
+        """第p百分位（0~100），在箱内线性插值；没有数据时返回None"""
+        if not self.total:
+            return None
+        rank = p / 100 * self.total
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            if count and cumulative + count >= rank:
+                value = (i + (rank - cumulative) / count) * self.resolution
+                return round(min(value, 100.0), 2)
+            cumulative += count
+        return 100.0
+    
+    def histogram(self, bin_width=10):
+        """按 bin_width 分段统计人数，例如 {"0-10": 3, ..., "90-100": 8}"""
+        result = {}
+        per_bucket = int(round(bin_width / self.resolution))
+        for start in range(0, 100, bin_width):
+            first = int(round(start / self.resolution))
+            last = min(first + per_bucket, self.bin_count)
+            if start + bin_width >= 100:
+                last = self.bin_count  # 最后一段包含满分
+            result[f"{start}-{min(start + bin_width, 100)}"] = sum(self.counts[first:last])
+        return result
+    
+    def to_dict(self):
+        return {"resolution": self.resolution, "counts": self.counts}
+    
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["resolution"], data["counts"])
+
+class DistributionSketches:
+    """成绩分布草图：全班平均分一个直方图，每个科目各一个直方图"""
+    
+    def __init__(self, resolution=0.5):
+        self.resolution = resolution
+        self.averages = ScoreHistogram(resolution)  # 只统计有成绩（平均分>0）的学生
+        self.subjects = {}
+    
+    def _subject(self, subject):
+        if subject not in self.subjects:
+            self.subjects[subject] = ScoreHistogram(self.resolution)
+        return self.subjects[subject]
+    
+    def add_student(self, student):
+        for subject, score in student.subjects.items():
+            self._subject(subject).add(score)
+        if student.get_average() > 0:
+            self.averages.add(student.get_average())
+    
+    def remove_student(self, student):
+        for subject, score in student.subjects.items():
+            self.subjects[subject].discard(score)
+        if student.get_average() > 0:
+            self.averages.discard(student.get_average())
+    
+    def update_score(self, subject, old_score, new_score, old_avg, new_avg):
+        """某科成绩从 old_score（None表示原来没有）变为 new_score"""
+        sketch = self._subject(subject)
+        if old_score is not None:
+            sketch.discard(old_score)
+        sketch.add(new_score)
+        if old_avg > 0:
+            self.averages.discard(old_avg)
+        if new_avg > 0:
+            self.averages.add(new_avg)
+    
+    def rebuild(self, students):
+        self.__init__(self.resolution)
+        for student in students:
+            self.add_student(student)
+    
+    def get(self, subject=None):
+        """subject 为None时返回平均分的直方图，否则返回该科目的直方图（没有时为None）"""
+        return self.averages if subject is None else self.subjects.get(subject)
+
+class SubjectScoreIndex:
+    """科目成绩索引：每个科目一个按 (成绩, 学号) 排序的列表，外加成绩总和（以0.01分为单位）
+
+    科目平均分是O(1)，前N名和分数段查询用二分查找，不需要扫描全部学生。
+    """
+
+    def __init__(self):
+        self.entries = {}       # 科目 -> 有序的 [(成绩, 学号), ...]
+        self.total_cents = {}   # 科目 -> 成绩总和（整数，避免浮点误差累积）
+
+    def _insert(self, subject, student_id, score):
+        bisect.insort(self.entries.setdefault(subject, []), (score, student_id))
+        self.total_cents[subject] = self.total_cents.get(subject, 0) + round(score * 100)
+
+    def _delete(self, subject, student_id, score):
+        entries = self.entries[subject]
+        del entries[bisect.bisect_left(entries, (score, student_id))]
+        self.total_cents[subject] -= round(score * 100)
+        if not entries:
+            del self.entries[subject]
+            del self.total_cents[subject]
+
+    def add_student(self, student):
+        for subject, score in student.subjects.items():
+            self._insert(subject, student.student_id, score)
+
+    def remove_student(self, student):
+        for subject, score in student.subjects.items():
+            self._delete(subject, student.student_id, score)
+
+    def update_score(self, student_id, subject, old_score, new_score):
+        """某科成绩从 old_score（None表示原来没有）变为 new_score"""
+        if old_score is not None:
+            self._delete(subject, student_id, old_score)
+        self._insert(subject, student_id, new_score)
+
+    def rebuild(self, students):
+        self.entries = {}
+        self.total_cents = {}
+        for student in students:
+            for subject, score in student.subjects.items():
+                self.entries.setdefault(subject, []).append((score, student.student_id))
+                self.total_cents[subject] = self.total_cents.get(subject, 0) + round(score * 100)
+        for entries in self.entries.values():
+            entries.sort()
+
+    def count(self, subject):
+        return len(self.entries.get(subject, ()))
+
+    def average(self, subject):
+        """科目平均分，没有成绩时为None"""
+        count = self.count(subject)
+        return round(self.total_cents[subject] / count / 100, 2) if count else None
+
+    def top(self, subject, n):
+        """该科成绩最高的n条 (成绩, 学号)，从高到低"""
+        entries = self.entries.get(subject, [])
+        return entries[:-n - 1:-1] if n > 0 else []
+
+    def between(self, subject, low=None, high=None, include_low=True, include_high=True):
+        """成绩在 [low, high] 范围内的 (成绩, 学号)，从低到高；边界为None表示不限"""
+        entries = self.entries.get(subject, [])
+        start, end = 0, len(entries)
+        # (分数,) 排在所有 (分数, 学号) 之前，(分数, chr(0x10FFFF)) 排在它们之后
+        if low is not None:
+            key = (low,) if include_low else (low, chr(0x10FFFF))
+            start = bisect.bisect_left(entries, key)
+        if high is not None:
+            key = (high, chr(0x10FFFF)) if include_high else (high,)
+            end = bisect.bisect_left(entries, key)
+        return entries[start:end]
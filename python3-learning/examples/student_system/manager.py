@@ -0,0 +1,830 @@
+# -*- coding: utf-8 -*-
+"""学生管理：StudentManager 及按学号分片的 ShardedStudentManager"""
+
+import os
+import csv
+import sys
+import heapq
+import zlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import chain, islice
+
+from .models import GRADE_LEVELS, Student
+from .indexes import ClassAggregates, ColumnarScoreStore, DistributionSketches, Leaderboard, NameSearchIndex, ScoreHistogram, StudentIndex, SubjectScoreIndex
+from .changes import ChangeFeed, MutationJournal, ScoreHistory
+from .storage import JsonFileBackend
+from .query import StudentQuery
+from .parallel import _format_partial, _merge_partial_tables, _parse_import_chunk, _partial_statistics
+
+def print_student_table(students, total, out=None, page=None, page_size=50, chunk_rows=1000):
+    """以表格形式输出学生名单
+    
+    行先在内存中拼成块（每块 chunk_rows 行）再一次写入 out（默认标准输出），
+    避免每行一次 print。指定 page（从1开始）时只格式化这一页：
+    students 为列表时直接切片，否则用 islice 跳过前面的学生。
+    """
+    if page is not None and page < 1:
+        raise ValueError(f"页码必须从1开始：{page}")
+    if page_size < 1:
+        raise ValueError(f"每页条数必须大于0：{page_size}")
+    if out is None:
+        out = sys.stdout
+    if not total:
+        out.write("📝 暂无学生数据\n")
+        return
+    
+    title = f"\n📋 学生名单（共{total}人）"
+    if page is not None:
+        pages = (total + page_size - 1) // page_size
+        title += f"，第{page}/{pages}页"
+        start = (page - 1) * page_size
+        if isinstance(students, list):
+            students = students[start:start + page_size]
+        else:
+            students = islice(students, start, start + page_size)
+    buffer = [title + "：",
+              "-" * 80,
+              f"{'学号':<10} {'姓名':<10} {'年级':<10} {'年龄':<8} {'平均分':<10} {'等级':<10}",
+              "-" * 80]
+    
+    for student in students:
+        buffer.append(f"{student.student_id:<10} {student.name:<10} {student.grade:<10} "
+                      f"{student.age:<8} {student.get_average():<10} {student.get_grade_level():<10}")
+        if len(buffer) >= chunk_rows:
+            out.write("\n".join(buffer) + "\n")
+            buffer.clear()
+    if buffer:
+        out.write("\n".join(buffer) + "\n")
+    out.flush()
+
+def _merge_name_matches(groups, limit):
+    """按匹配类别的先后顺序合并搜索结果并去重，最多 limit 名"""
+    result, seen = [], set()
+    for student in chain.from_iterable(groups):
+        if len(result) == limit:
+            break
+        if student.student_id not in seen:
+            seen.add(student.student_id)
+            result.append(student)
+    return result
+
+class RosterView:
+    """名单的只读视图：按加入顺序遍历学生，跳过删除留下的墓碑"""
+    
+    def __init__(self, manager):
+        self._manager = manager
+    
+    def __len__(self):
+        return len(self._manager._positions)
+    
+    def __iter__(self):
+        return (student for student in self._manager._roster if student is not None)
+
+class StudentManager:
+    """学生管理系统"""
+    
+    def __init__(self, data_file="students_data.json", index_fields=("grade", "name"),
+                 journal=False, compact_threshold=1000, columnar=False, backend=None,
+                 student_class=Student):
+        self.data_file = data_file
+        # 学生类：名单很大时可以换成省内存的 CompactStudent
+        self.student_class = student_class
+        # 存储后端：默认是JSON文件，也可以传入 SQLiteBackend 等实现
+        # （无论哪种后端，管理器都会把整个名单加载进内存）
+        self.backend = backend if backend is not None else JsonFileBackend(data_file)
+        if journal and not isinstance(self.backend, JsonFileBackend):
+            raise ValueError("日志模式只适用于JSON文件存储")
+        self.students = []
+        self.index = StudentIndex(index_fields)
+        # 列式后端：成绩额外保存在紧凑数组里，班级统计走向量化计算
+        self.columns = ColumnarScoreStore() if columnar else None
+        # 增量维护的班级统计，get_class_statistics 直接读取而不必扫描全部学生
+        self.aggregates = ClassAggregates()
+        self.leaderboard = Leaderboard()
+        self.sketches = DistributionSketches()
+        self.subject_index = SubjectScoreIndex()
+        self.name_search = None  # 第一次按姓名搜索（或调用 enable_name_search()）时才建立
+        # 日志模式：修改只追加到 <数据文件>.journal，日志条数达到阈值时再合并成新快照
+        self.journal = MutationJournal(data_file + ".journal") if journal else None
+        self.compact_threshold = compact_threshold
+        # 修改监听者：每次修改后以记录字典调用（自动保存等功能通过它得到通知）
+        self.listeners = []
+        self.change_feed = None  # 调用 enable_change_feed() 后才会记录变更
+        self.score_history = None  # 调用 enable_score_history() 后才会记录成绩历史
+        self.load_data()
+    
+    @property
+    def students(self):
+        """学生名单（保持加入顺序）
+        
+        删除学生时只在原位置留下墓碑（None）；有墓碑时返回跳过墓碑的只读视图，
+        读者从不修改名单。墓碑在保存时或超过一半时由写者一侧统一清理。
+        """
+        return RosterView(self) if self._tombstones else self._roster
+    
+    @students.setter
+    def students(self, students):
+        self._roster = students
+        self._positions = {student.student_id: i for i, student in enumerate(students)}
+        self._tombstones = 0
+    
+    def __len__(self):
+        return len(self._positions)
+    
+    def _compact_roster(self):
+        """去掉名单中的墓碑并重新记录位置（只能由写者或保存时调用）"""
+        if not self._tombstones:
+            return
+        roster = [student for student in self._roster if student is not None]
+        self._positions = {student.student_id: i for i, student in enumerate(roster)}
+        self._roster, self._tombstones = roster, 0
+    
+    def _append(self, student):
+        """把学生追加到名单末尾并记录位置"""
+        self._positions[student.student_id] = len(self._roster)
+        self._roster.append(student)
+    
+    def _discard(self, student_id):
+        """O(1) 地把学生移出名单：原位置改为墓碑，墓碑超过一半时压缩"""
+        self._roster[self._positions.pop(student_id)] = None
+        self._tombstones += 1
+        if self._tombstones > len(self._roster) // 2:
+            self._compact_roster()
+    
+    def load_data(self):
+        """从文件加载学生数据"""
+        try:
+            if self.backend.exists():
+                # 流式读取：边读边创建学生，峰值内存不再是“整个文件文本 + 整个字典列表”
+                students = self.backend.load()
+                if self.student_class is not Student:
+                    students = map(self.student_class.from_student, students)
+                self.students = list(students)
+                print(f"✅ 成功加载 {len(self.students)} 名学生的数据")
+            else:
+                print("📁 数据文件不存在，将创建新的数据文件")
+        except Exception as e:
+            print(f"❌ 加载数据失败：{e}")
+            self.students = []
+        self._rebuild_derived()
+        if self.journal is not None:
+            self._replay_journal()
+    
+    def _rebuild_derived(self):
+        """根据 self.students 重建索引等派生结构"""
+        self.index.rebuild(self.students)
+        self.aggregates.rebuild(self.students)
+        self.leaderboard.rebuild(self.students)
+        self.sketches.rebuild(self.students)
+        self.subject_index.rebuild(self.students)
+        if self.name_search is not None:
+            self.name_search.rebuild(self.students)
+        if self.columns is not None:
+            self.columns.rebuild(self.students)
+    
+    def _attach(self, student):
+        """把学生加入名单，并同步更新派生结构"""
+        self._append(student)
+        self.index.add(student)
+        self.aggregates.add(student.get_average())
+        self.leaderboard.add(student)
+        self.sketches.add_student(student)
+        self.subject_index.add_student(student)
+        if self.name_search is not None:
+            self.name_search.add(student)
+        if self.columns is not None:
+            self.columns.add_student(student)
+    
+    def _detach(self, student):
+        """把学生移出名单，并同步更新派生结构"""
+        self._discard(student.student_id)
+        self._unindex(student)
+    
+    def _unindex(self, student):
+        """把学生从各派生结构中移除"""
+        self.index.remove(student)
+        self.aggregates.discard(student.get_average())
+        self.leaderboard.discard(student.student_id)
+        self.sketches.remove_student(student)
+        self.subject_index.remove_student(student)
+        if self.name_search is not None:
+            self.name_search.remove(student)
+        if self.columns is not None:
+            self.columns.remove_student(student.student_id)
+    
+    def _set_score(self, student, subject, score):
+        """写入成绩，并同步更新派生结构"""
+        old_avg = student.get_average()
+        old_score = student.subjects.get(subject)
+        student.add_score(subject, score)
+        new_avg = student.get_average()
+        self.aggregates.discard(old_avg)
+        self.aggregates.add(new_avg)
+        self.leaderboard.update(student)
+        self.sketches.update_score(subject, old_score, score, old_avg, new_avg)
+        self.subject_index.update_score(student.student_id, subject, old_score, score)
+        if self.columns is not None:
+            self.columns.set_score(student.student_id, subject, score)
+    
+    def _replay_journal(self):
+        """在快照之上重放日志中的修改"""
+        replayed = 0
+        for record in self.journal.replay():
+            op = record.get("op")
+            if op == "add":
+                student = self.student_class.from_dict(record["student"])
+                if student.student_id not in self.index:
+                    self._attach(student)
+            elif op == "remove":
+                student = self.index.get(record["student_id"])
+                if student:
+                    self._detach(student)
+            elif op == "score":
+                student = self.index.get(record["student_id"])
+                if student:
+                    self._set_score(student, record["subject"], record["score"])
+            replayed += 1
+        if replayed:
+            print(f"📜 已重放 {replayed} 条日志记录")
+    
+    def _publish(self, record):
+        """把一次修改交给存储后端，并通知所有监听者"""
+        self.backend.apply(record)
+        for listener in self.listeners:
+            listener(record)
+    
+    def _log(self, record):
+        """发布一次修改；日志模式下还要追加到日志，达到阈值时自动合并"""
+        self._publish(record)
+        if self.journal is None:
+            return
+        self.journal.append(record)
+        if self.journal.entry_count >= self.compact_threshold:
+            self.compact()
+    
+    def _compact_for_save(self):
+        """保存前清理删除留下的墓碑（ConcurrentStudentManager 改为在写锁下清理）"""
+        self._compact_roster()
+    
+    def compact(self):
+        """把快照和日志合并成新快照，然后清空日志"""
+        self._compact_roster()
+        try:
+            self.backend.save(self.students, compact=True)
+            if self.journal is not None:
+                self.journal.truncate()
+            return True
+        except Exception as e:
+            print(f"❌ 合并日志失败：{e}")
+            return False
+    
+    def save_data(self, quiet=False):
+        """保存学生数据到文件（quiet=True 时成功不打印提示，供后台自动保存使用）"""
+        self._compact_for_save()
+        try:
+            if self.score_history is not None:
+                self.score_history.flush()
+            if self.journal is not None:
+                # 日志模式下修改已经逐条落盘，这里只需刷新日志
+                self.journal.flush()
+                if not quiet:
+                    print("💾 数据已保存（日志模式）")
+                return True
+            if self.backend.incremental:
+                self.backend.flush()
+            else:
+                self.backend.save(self.students)
+            if not quiet:
+                print("💾 数据已保存")
+            return True
+        except Exception as e:
+            print(f"❌ 保存数据失败：{e}")
+            return False
+    
+    def add_student(self, student_id, name, grade, age):
+        """添加学生"""
+        # 检查学号是否已存在
+        if self.find_student(student_id):
+            print(f"❌ 学号 {student_id} 已存在！")
+            return False
+        
+        try:
+            student = self.student_class(student_id, name, grade, int(age))
+            self._attach(student)
+            self._log({"op": "add", "student": student.to_dict()})
+            print(f"✅ 成功添加学生：{name}")
+            return True
+        except ValueError as e:
+            print(f"❌ 添加学生失败：{e}")
+            return False
+    
+    def bulk_import(self, file_path, workers=None, chunk_size=20000):
+        """批量导入CSV或JSON Lines格式的学生和成绩
+        
+        文件按块分给进程池并行解析和校验，最后一次性合并进名单，不会逐条打印。
+        CSV需要表头，字段内不能换行。返回导入结果摘要。
+        """
+        file_format = "jsonl" if str(file_path).endswith((".jsonl", ".ndjson")) else "csv"
+        with open(file_path, 'r', encoding='utf-8', newline='') as f:
+            fieldnames = next(csv.reader([f.readline()])) if file_format == "csv" else None
+            first_line_no = 2 if file_format == "csv" else 1
+            lines = f.readlines()
+        chunks = [(file_format, fieldnames, lines[i:i + chunk_size], first_line_no + i)
+                  for i in range(0, len(lines), chunk_size)]
+        
+        if workers == 1 or len(chunks) <= 1:
+            results = [_parse_import_chunk(*chunk) for chunk in chunks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_parse_import_chunk, *zip(*chunks)))
+        
+        new_students, new_scores, errors = [], [], []
+        for students, scores, chunk_errors in results:
+            new_students.extend(students)
+            new_scores.extend(scores)
+            errors.extend(chunk_errors)
+        candidates = self._prepare_import(new_students, new_scores, errors)
+        summary = self._merge_import(candidates, new_scores, errors)
+        print(f"📥 导入完成：新增学生 {summary['students']} 名，成绩 {summary['scores']} 条，"
+              f"错误 {len(summary['errors'])} 条")
+        return summary
+    
+    def _prepare_import(self, new_students, new_scores, errors):
+        """在合并之前创建新学生对象并写入他们的成绩，返回 [(学生, 新增记录), ...]
+        
+        这些对象还不在名单里，不需要持有锁；文件中重复的学号以第一次出现为准。
+        """
+        students = {}
+        for student_id, name, grade, age in new_students:
+            if student_id in students:
+                errors.append((None, f"学号 {student_id} 已存在"))
+                continue
+            students[student_id] = self.student_class(student_id, name, grade, age)
+        for student_id, subject, score in new_scores:
+            student = students.get(student_id)
+            if student is not None:
+                student.add_score(subject, score)
+        return [(student, {"op": "add", "student": student.to_dict()})
+                for student in students.values()]
+    
+    def _merge_import(self, candidates, new_scores, errors):
+        """把 _prepare_import 准备好的学生和其余成绩合并进名单"""
+        # 导入量相对现有名单较大时，直接写入后统一重建派生结构更快
+        rebuild = len(candidates) + len(new_scores) > len(self)
+        added, records = set(), []
+        for student, record in candidates:
+            if student.student_id in self.index:
+                errors.append((None, f"学号 {student.student_id} 已存在"))
+                continue
+            if rebuild:
+                self._append(student)
+                self.index.add(student)
+            else:
+                self._attach(student)
+            added.add(student.student_id)
+            records.append(record)
+        
+        # 新学生的成绩已经写好并包含在新增记录里，这里只处理已有学生的成绩
+        score_count = 0
+        for student_id, subject, score in new_scores:
+            if student_id in added:
+                score_count += 1
+                continue
+            student = self.index.get(student_id)
+            if student is None:
+                errors.append((None, f"找不到学号为 {student_id} 的学生"))
+                continue
+            if rebuild:
+                student.add_score(subject, score)
+            else:
+                self._set_score(student, subject, score)
+            records.append({"op": "score", "student_id": student_id,
+                            "subject": subject, "score": score})
+            score_count += 1
+        
+        if rebuild:
+            self._rebuild_derived()
+        for record in records:
+            self._publish(record)
+        if self.journal is not None:
+            # 批量导入不逐条写日志，直接合并成新快照
+            self.compact()
+        return {"students": len(added), "scores": score_count, "errors": errors}
+    
+    def find_student(self, student_id):
+        """查找学生（通过学号索引，O(1)）"""
+        return self.index.get(student_id)
+    
+    def find_students_by(self, field, value):
+        """按字段查找学生：有二级索引时走索引，否则退化为顺序扫描"""
+        if field in self.index.secondary:
+            return self.index.find_by(field, value)
+        return [student for student in self.students if getattr(student, field) == value]
+    
+    def find_students_by_grade(self, grade):
+        """按年级查找学生"""
+        return self.find_students_by("grade", grade)
+    
+    def find_students_by_name(self, name):
+        """按姓名查找学生（可能有重名）"""
+        return self.find_students_by("name", name)
+
+    def _name_matches(self, text, limit):
+        """分别返回前缀匹配、子串匹配和容错匹配（差一个字）的学生，每类最多 limit 名"""
+        index = self.name_search if self.name_search is not None else self.enable_name_search()
+        return [index.prefix(text, limit), index.contains(text, limit), index.fuzzy(text, limit)]
+
+    def search_students(self, text, limit=20):
+        """按部分姓名搜索：依次取前缀匹配、子串匹配和容错匹配，最多 limit 名
+        
+        姓名搜索索引第一次搜索时才建立，之后随修改同步更新。
+        """
+        return _merge_name_matches(self._name_matches(text, limit), limit)
+    
+    def remove_student(self, student_id):
+        """删除学生"""
+        student = self.find_student(student_id)
+        if student:
+            self._detach(student)
+            self._log({"op": "remove", "student_id": student_id})
+            print(f"✅ 成功删除学生：{student.name}")
+            return True
+        else:
+            print(f"❌ 找不到学号为 {student_id} 的学生")
+            return False
+    
+    def remove_students_where(self, predicate):
+        """删除所有满足条件的学生（例如 lambda s: s.grade == "高三" 整届毕业）
+        
+        只遍历一次名单；删除的人数多于剩下的人数时直接重建派生结构。返回删除的人数。
+        """
+        kept, removed = [], []
+        for student in self.students:
+            (removed if predicate(student) else kept).append(student)
+        if not removed:
+            return 0
+        self.students = kept
+        if len(removed) > len(kept):
+            self._rebuild_derived()
+        else:
+            for student in removed:
+                self._unindex(student)
+        for student in removed:
+            self._log({"op": "remove", "student_id": student.student_id})
+        print(f"✅ 成功删除 {len(removed)} 名学生")
+        return len(removed)
+    
+    def add_student_score(self, student_id, subject, score):
+        """为学生添加成绩"""
+        student = self.find_student(student_id)
+        if student:
+            try:
+                self._set_score(student, subject, float(score))
+                self._log({"op": "score", "student_id": student_id,
+                           "subject": subject, "score": float(score)})
+                print(f"✅ 成功为 {student.name} 添加 {subject} 成绩：{score}分")
+                return True
+            except ValueError as e:
+                print(f"❌ 添加成绩失败：{e}")
+                return False
+        else:
+            print(f"❌ 找不到学号为 {student_id} 的学生")
+            return False
+    
+    def get_score_percentiles(self, subject=None, percentiles=(50, 90, 99)):
+        """成绩百分位（来自增量维护的直方图，常数时间）；subject 为None时针对平均分"""
+        sketch = self.sketches.get(subject)
+        if sketch is None:
+            return None
+        return {f"p{p}": sketch.percentile(p) for p in percentiles}
+    
+    def get_score_histogram(self, subject=None, bin_width=10):
+        """成绩分段人数；subject 为None时针对平均分"""
+        sketch = self.sketches.get(subject)
+        return None if sketch is None else sketch.histogram(bin_width)
+
+    def get_subject_average(self, subject):
+        """某科的平均分（来自科目成绩索引，常数时间），没有成绩时为None"""
+        return self.subject_index.average(subject)
+
+    def get_subject_top_students(self, subject, n=3):
+        """某科成绩最高的n名学生，返回 [(学生, 成绩), ...]"""
+        return [(self.index.get(student_id), score)
+                for score, student_id in self.subject_index.top(subject, n)]
+
+    def get_students_below(self, subject, threshold=60):
+        """某科成绩低于 threshold 的学生，按成绩从低到高返回 [(学生, 成绩), ...]"""
+        return [(self.index.get(student_id), score) for score, student_id
+                in self.subject_index.between(subject, high=threshold, include_high=False)]
+
+    def query(self):
+        """创建一个针对当前名单的查询，见 StudentQuery"""
+        return StudentQuery(self)
+    
+    def get_top_students(self, n=3):
+        """平均分最高的n名学生"""
+        return self.leaderboard.top(n)
+    
+    def get_bottom_students(self, n=3):
+        """平均分最低的n名学生"""
+        return self.leaderboard.bottom(n)
+    
+    def get_student_rank(self, student_id):
+        """学生的 (名次, 百分位)，找不到时返回None"""
+        return self.leaderboard.rank(student_id)
+    
+    def show_all_students(self, page=None, page_size=50, out=None):
+        """显示所有学生信息；可以只显示某一页，也可以输出到任意文件对象"""
+        print_student_table(self.students, len(self.students), out=out,
+                            page=page, page_size=page_size)
+    
+    def show_student_detail(self, student_id):
+        """显示学生详细信息"""
+        student = self.find_student(student_id)
+        if not student:
+            print(f"❌ 找不到学号为 {student_id} 的学生")
+            return
+        
+        print(f"\n👤 学生详细信息：")
+        print("-" * 40)
+        print(f"学号：{student.student_id}")
+        print(f"姓名：{student.name}")
+        print(f"年级：{student.grade}")
+        print(f"年龄：{student.age}")
+        print(f"入学时间：{student.created_date.strftime('%Y-%m-%d')}")
+        print(f"平均分：{student.get_average()}")
+        print(f"等级：{student.get_grade_level()}")
+        
+        if student.subjects:
+            print("\n📊 各科成绩：")
+            for subject, score in student.subjects.items():
+                print(f"  {subject}: {score}分")
+        else:
+            print("\n📊 暂无成绩记录")
+    
+    def enable_change_feed(self, capacity=100000, feed_file=None):
+        """开启变更流，之后每次修改都会得到一个序号，见 ChangeFeed"""
+        if self.change_feed is None:
+            self.change_feed = ChangeFeed(capacity, feed_file)
+            self.listeners.append(self.change_feed.record)
+        return self.change_feed
+    
+    def enable_name_search(self):
+        """建立姓名搜索索引（每名学生约1KB），之后随修改同步更新，见 NameSearchIndex"""
+        if self.name_search is None:
+            name_search = NameSearchIndex(self.index.secondary.get("name"))
+            name_search.rebuild(self.students)
+            self.name_search = name_search
+        return self.name_search
+    
+    def enable_score_history(self, history_file=None):
+        """开启成绩历史，之后每次成绩修改都会带时间记录下来，见 ScoreHistory
+        
+        已有的成绩以开启时刻记为各科历史的第一条。
+        """
+        if self.score_history is None:
+            self.score_history = ScoreHistory(history_file)
+            self.score_history.seed(self.students)
+            self.listeners.append(self.score_history.on_change)
+        return self.score_history
+    
+    def export_changes(self, since_seq=0):
+        """增量导出：返回 since_seq 之后的全部变更；无法增量时退化为全量快照
+        
+        返回 {"seq": 当前最新序号, "full": 是否全量, "changes" 或 "students": 数据}，
+        下一次同步时把 seq 作为 since_seq 传入即可。
+        """
+        feed = self.change_feed if self.change_feed is not None else self.enable_change_feed()
+        # since_seq 早于变更流开始（例如第一次同步、重启后没有 feed_file），
+        # 或者不是本变更流发出的序号时，都只能全量导出
+        if feed.base_seq <= since_seq <= feed.last_seq:
+            try:
+                return {"seq": feed.last_seq, "full": False,
+                        "changes": feed.changes_since(since_seq)}
+            except LookupError:
+                pass
+        return {"seq": feed.last_seq, "full": True,
+                "students": [student.to_dict() for student in self.students]}
+    
+    def parallel_statistics(self, group_by=None, workers=None, partitions=None):
+        """用进程池分区计算统计（map-reduce），结果格式与 get_class_statistics 相同
+        
+        group_by 为 None 时返回全班统计；为 "grade" 或 "subject" 时返回
+        {年级/科目: 统计结果}，按科目分组时“总学生数”为该科目的成绩条数。
+        """
+        if group_by not in (None, "grade", "subject"):
+            raise ValueError("group_by 只能是 None、\"grade\" 或 \"subject\"")
+        workers = workers or os.cpu_count() or 1
+        partitions = partitions or workers * 4
+        rows = self._statistics_rows()
+        size = max(1, -(-len(rows) // partitions))
+        chunks = [rows[i:i + size] for i in range(0, len(rows), size)]
+        
+        if workers == 1 or len(chunks) <= 1:
+            partials = [_partial_statistics(chunk) for chunk in chunks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                partials = list(pool.map(_partial_statistics, chunks))
+        
+        key = "all" if group_by is None else group_by
+        merged = _merge_partial_tables(partial[key] for partial in partials)
+        if group_by is None:
+            return _format_partial(merged[None]) if merged else "暂无数据"
+        return {name: _format_partial(acc) for name, acc in merged.items()}
+    
+    def _statistics_rows(self):
+        """名单快照，只含计算需要的最少数据：年级和 (科目, 成绩) 元组"""
+        return [(student.grade, tuple(student.subjects.items())) for student in self.students]
+    
+    def get_class_statistics(self, recompute=False):
+        """获取班级统计信息
+        
+        默认直接读取增量维护的统计结果；recompute=True 时重新完整计算
+        （有列式存储时走向量化计算，否则遍历全部学生）。
+        """
+        if not recompute:
+            return self.aggregates.statistics(len(self))
+        
+        if self.columns is not None:
+            return self.columns.statistics()
+        
+        # 存储层能直接聚合时（如SQLite）把计算下推
+        stats = self.backend.statistics()
+        if stats is not None:
+            return stats
+        
+        if not self.students:
+            return "暂无数据"
+        
+        # 一次遍历同时得到总分、最高分、最低分和等级分布
+        count = 0
+        total = 0
+        highest_score = None
+        lowest_score = None
+        grade_counts = {level: 0 for level in GRADE_LEVELS}
+        for student in self.students:
+            avg = student.get_average()
+            if avg <= 0:
+                continue
+            count += 1
+            total += avg
+            if highest_score is None or avg > highest_score:
+                highest_score = avg
+            if lowest_score is None or avg < lowest_score:
+                lowest_score = avg
+            grade_counts[student.get_grade_level()] += 1
+        
+        if not count:
+            return "暂无有效成绩数据"
+        
+        class_average = round(total / count, 2)
+        
+        return {
+            "总学生数": len(self.students),
+            "班级平均分": class_average,
+            "最高分": highest_score,
+            "最低分": lowest_score,
+            "等级分布": grade_counts
+        }
+
+class ShardedStudentManager:
+    """分片学生管理系统：按学号哈希把学生分到N个独立的 StudentManager
+    
+    每个分片有自己的数据文件（或存储后端），可以独立加载和保存；
+    统计、名单显示等全局查询会访问所有分片再合并结果。
+    """
+    
+    def __init__(self, shard_count=4, base_name="students_data", backends=None, **manager_options):
+        if backends is not None:
+            shard_count = len(backends)
+        if shard_count < 1:
+            raise ValueError("分片数量必须大于0")
+        self.shards = []
+        for i in range(shard_count):
+            options = dict(manager_options)
+            if backends is not None:
+                options["backend"] = backends[i]
+            self.shards.append(StudentManager(f"{base_name}_{i}.json", **options))
+    
+    def shard_for(self, student_id):
+        """学号所在的分片（crc32 在不同进程之间结果稳定，不受哈希随机化影响）"""
+        return self.shards[zlib.crc32(str(student_id).encode('utf-8')) % len(self.shards)]
+    
+    @property
+    def students(self):
+        """所有分片的学生（只读视图）"""
+        return list(chain.from_iterable(shard.students for shard in self.shards))
+    
+    def __len__(self):
+        return sum(len(shard) for shard in self.shards)
+    
+    def load_data(self):
+        """各分片分别加载"""
+        for shard in self.shards:
+            shard.load_data()
+    
+    def save_data(self, parallel=True):
+        """各分片分别保存，parallel=True 时并发写入"""
+        if parallel and len(self.shards) > 1:
+            with ThreadPoolExecutor(max_workers=len(self.shards)) as pool:
+                results = list(pool.map(lambda shard: shard.save_data(), self.shards))
+        else:
+            results = [shard.save_data() for shard in self.shards]
+        return all(results)
+    
+    def add_student(self, student_id, name, grade, age):
+        """添加学生"""
+        return self.shard_for(student_id).add_student(student_id, name, grade, age)
+    
+    def find_student(self, student_id):
+        """查找学生"""
+        return self.shard_for(student_id).find_student(student_id)
+    
+    def find_students_by(self, field, value):
+        """按字段查找学生"""
+        return list(chain.from_iterable(shard.find_students_by(field, value)
+                                        for shard in self.shards))
+
+    def search_students(self, text, limit=20):
+        """按部分姓名搜索：先合并所有分片的前缀匹配，再是子串匹配和容错匹配，最多 limit 名"""
+        per_shard = [shard._name_matches(text, limit) for shard in self.shards]
+        return _merge_name_matches([chain.from_iterable(matches)
+                                    for matches in zip(*per_shard)], limit)
+    
+    def remove_student(self, student_id):
+        """删除学生"""
+        return self.shard_for(student_id).remove_student(student_id)
+    
+    def remove_students_where(self, predicate):
+        """各分片分别批量删除，返回删除的总人数"""
+        return sum(shard.remove_students_where(predicate) for shard in self.shards)
+    
+    def add_student_score(self, student_id, subject, score):
+        """为学生添加成绩"""
+        return self.shard_for(student_id).add_student_score(student_id, subject, score)
+    
+    def show_student_detail(self, student_id):
+        """显示学生详细信息"""
+        self.shard_for(student_id).show_student_detail(student_id)
+    
+    def show_all_students(self, page=None, page_size=50, out=None):
+        """显示所有分片的学生信息"""
+        print_student_table(chain.from_iterable(shard.students for shard in self.shards), len(self),
+                            out=out, page=page, page_size=page_size)
+    
+    def get_top_students(self, n=3):
+        """各分片取前n名后再合并"""
+        candidates = chain.from_iterable(shard.get_top_students(n) for shard in self.shards)
+        return heapq.nlargest(n, candidates, key=lambda student: student.get_average())
+    
+    def get_bottom_students(self, n=3):
+        """各分片取后n名后再合并"""
+        candidates = chain.from_iterable(shard.get_bottom_students(n) for shard in self.shards)
+        return heapq.nsmallest(n, candidates, key=lambda student: student.get_average())
+    
+    def get_score_percentiles(self, subject=None, percentiles=(50, 90, 99)):
+        """合并各分片的直方图后计算百分位"""
+        sketches = [shard.sketches.get(subject) for shard in self.shards]
+        sketches = [sketch for sketch in sketches if sketch is not None]
+        if not sketches:
+            return None
+        merged = ScoreHistogram.merged(sketches, sketches[0].resolution)
+        return {f"p{p}": merged.percentile(p) for p in percentiles}
+
+    def get_subject_average(self, subject):
+        """合并各分片的科目成绩总和与人数"""
+        indexes = [shard.subject_index for shard in self.shards]
+        count = sum(index.count(subject) for index in indexes)
+        if not count:
+            return None
+        return round(sum(index.total_cents.get(subject, 0) for index in indexes) / count / 100, 2)
+
+    def get_subject_top_students(self, subject, n=3):
+        """各分片取该科前n名后再合并"""
+        candidates = chain.from_iterable(shard.get_subject_top_students(subject, n)
+                                         for shard in self.shards)
+        return heapq.nlargest(n, candidates, key=lambda pair: pair[1])
+
+    def get_students_below(self, subject, threshold=60):
+        """合并各分片中该科低于 threshold 的学生"""
+        return list(heapq.merge(*(shard.get_students_below(subject, threshold)
+                                  for shard in self.shards), key=lambda pair: pair[1]))
+    
+    def get_class_statistics(self):
+        """合并各分片增量维护的统计结果"""
+        total_students = len(self)
+        if not total_students:
+            return "暂无数据"
+        parts = [shard.aggregates for shard in self.shards if shard.aggregates.count]
+        if not parts:
+            return "暂无有效成绩数据"
+        count = sum(part.count for part in parts)
+        grade_counts = {level: sum(part.grade_counts[level] for part in parts)
+                        for level in GRADE_LEVELS}
+        return {
+            "总学生数": total_students,
+            "班级平均分": round(sum(part.total_cents for part in parts) / count / 100, 2),
+            "最高分": max(part.highest() for part in parts),
+            "最低分": min(part.lowest() for part in parts),
+            "等级分布": grade_counts
+        }
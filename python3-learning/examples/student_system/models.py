@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+"""学生模型：Student 及省内存的 CompactStudent"""
+
+import sys
+import datetime
+import threading
+from array import array
+from itertools import chain
+
+GRADE_LEVELS = ("优秀", "良好", "及格", "需要努力")
+
+def grade_level_of(avg):
+    """根据平均分返回成绩等级"""
+    if avg >= 90:
+        return "优秀"
+    elif avg >= 80:
+        return "良好"
+    elif avg >= 60:
+        return "及格"
+    else:
+        return "需要努力"
+
+class Student:
+    """学生类"""
+    
+    def __init__(self, student_id, name, grade, age, created_date=None):
+        self.student_id = student_id
+        self.name = name
+        self.grade = grade
+        self.age = age
+        self.subjects = {}  # 学科成绩字典
+        # 从文件加载时直接使用保存的入学时间（可以是ISO字符串），不必先取一次当前时间
+        self.created_date = datetime.datetime.now() if created_date is None else created_date
+    
+    @property
+    def subjects(self):
+        """学科成绩字典（修改成绩请使用 add_score，以便平均分缓存失效）"""
+        return self._subjects
+    
+    @subjects.setter
+    def subjects(self, value):
+        self._subjects = value
+        self._average = None      # 平均分缓存
+        self._grade_level = None  # 等级缓存
+    
+    @property
+    def created_date(self):
+        """入学时间（从文件加载时先保存ISO字符串，第一次访问时才解析）"""
+        if isinstance(self._created_date, str):
+            self._created_date = datetime.datetime.fromisoformat(self._created_date)
+        return self._created_date
+    
+    @created_date.setter
+    def created_date(self, value):
+        self._created_date = value
+    
+    def add_score(self, subject, score):
+        """添加学科成绩"""
+        if not isinstance(score, (int, float)):
+            raise ValueError("成绩必须是数字")
+        
+        if not 0 <= score <= 100:
+            raise ValueError("成绩必须在0-100之间")
+        
+        self._subjects[subject] = score
+        self._average = None
+        self._grade_level = None
+        return True
+    
+    def get_average(self):
+        """计算平均分（结果会被缓存，直到下一次 add_score）"""
+        if self._average is None:
+            if not self._subjects:
+                self._average = 0
+            else:
+                self._average = round(sum(self._subjects.values()) / len(self._subjects), 2)
+        return self._average
+    
+    def get_grade_level(self):
+        """获取成绩等级（同样被缓存）"""
+        if self._grade_level is None:
+            self._grade_level = grade_level_of(self.get_average())
+        return self._grade_level
+    
+    def to_dict(self):
+        """转换为字典（用于JSON序列化）"""
+        return {
+            "student_id": self.student_id,
+            "name": self.name,
+            "grade": self.grade,
+            "age": self.age,
+            "subjects": dict(self.subjects),  # 复制一份，避免记录被之后的修改影响
+            # 尚未解析过的日期直接原样写回，省去一次解析和格式化
+            "created_date": (self._created_date if isinstance(self._created_date, str)
+                             else self._created_date.isoformat())
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        """从字典创建学生对象"""
+        # 入学时间的ISO字符串延迟解析，见 created_date 属性
+        student = cls(data["student_id"], data["name"], data["grade"], data["age"],
+                      data.get("created_date"))
+        student.subjects = data.get("subjects", {})
+        return student
+    
+    def __str__(self):
+        return f"Student(ID:{self.student_id}, 姓名:{self.name}, 平均分:{self.get_average()})"
+
+class SymbolTable:
+    """字符串驻留表：相同的字符串只保存一份，并分配一个小整数编号
+
+    编号一旦分配就不再改变；登记新字符串时加锁，多个线程可以同时创建学生。
+    """
+
+    def __init__(self):
+        self._ids = {}
+        self._names = []
+        self._lock = threading.Lock()
+
+    def id_of(self, name):
+        """返回字符串的编号，第一次出现时登记"""
+        symbol_id = self._ids.get(name)
+        if symbol_id is None:
+            with self._lock:
+                symbol_id = self._ids.get(name)
+                if symbol_id is None:
+                    self._names.append(sys.intern(name))
+                    symbol_id = self._ids[name] = len(self._names) - 1
+        return symbol_id
+
+    def name_of(self, symbol_id):
+        return self._names[symbol_id]
+
+    def __len__(self):
+        return len(self._names)
+
+# 所有 CompactStudent 共用的学科表和年级表
+SUBJECT_TABLE = SymbolTable()
+
+GRADE_TABLE = SymbolTable()
+
+EPOCH = datetime.datetime(1970, 1, 1)
+
+ONE_MICROSECOND = datetime.timedelta(microseconds=1)
+
+class CompactStudent:
+    """省内存的学生类，公开接口与 Student 相同
+
+    使用 __slots__ 去掉实例字典；年级和学科名保存为共享表中的编号，
+    成绩以 [学科编号, 分数, ...] 的形式放在一个 array('d') 里，
+    浮点数成绩的学科编号按位取反（~编号）保存，读出时整数成绩仍是 int；
+    入学时间保存为自1970年起的微秒整数（当地时间）加上时区偏移秒数（不带时区时为 None）。
+    subjects 每次访问都会生成一个新字典，修改成绩请使用 add_score。
+    """
+
+    __slots__ = ("student_id", "name", "age", "_grade_id", "_scores", "_created", "_utcoffset",
+                 "_average")
+
+    def __init__(self, student_id, name, grade, age, created_date=None):
+        self.student_id = student_id
+        self.name = name
+        self.grade = grade
+        self.age = age
+        self.subjects = {}
+        self.created_date = datetime.datetime.now() if created_date is None else created_date
+
+    @property
+    def grade(self):
+        return GRADE_TABLE.name_of(self._grade_id)
+
+    @grade.setter
+    def grade(self, value):
+        self._grade_id = GRADE_TABLE.id_of(value)
+
+    @property
+    def subjects(self):
+        """学科成绩字典（每次访问生成的副本）"""
+        scores = self._scores
+        subjects = {}
+        for i in range(0, len(scores), 2):
+            key = int(scores[i])
+            if key >= 0:
+                subjects[SUBJECT_TABLE.name_of(key)] = int(scores[i + 1])
+            else:
+                subjects[SUBJECT_TABLE.name_of(~key)] = scores[i + 1]
+        return subjects
+
+    @staticmethod
+    def _score_key(subject, score):
+        """学科编号；浮点数成绩取反，以便读出时还原成绩的类型"""
+        subject_id = SUBJECT_TABLE.id_of(subject)
+        return subject_id if isinstance(score, int) else ~subject_id
+
+    @subjects.setter
+    def subjects(self, value):
+        self._scores = array('d', chain.from_iterable(
+            (self._score_key(subject, score), score) for subject, score in value.items()))
+        self._average = None
+
+    @property
+    def created_date(self):
+        value = EPOCH + self._created * ONE_MICROSECOND
+        if self._utcoffset is None:
+            return value
+        return value.replace(tzinfo=datetime.timezone(datetime.timedelta(seconds=self._utcoffset)))
+
+    @created_date.setter
+    def created_date(self, value):
+        if isinstance(value, str):
+            value = datetime.datetime.fromisoformat(value)
+        offset = value.utcoffset()
+        self._utcoffset = None if offset is None else offset // datetime.timedelta(seconds=1)
+        self._created = (value.replace(tzinfo=None) - EPOCH) // ONE_MICROSECOND
+
+    def add_score(self, subject, score):
+        """添加学科成绩"""
+        if not isinstance(score, (int, float)):
+            raise ValueError("成绩必须是数字")
+
+        if not 0 <= score <= 100:
+            raise ValueError("成绩必须在0-100之间")
+
+        key = self._score_key(subject, score)
+        subject_id = key if key >= 0 else ~key
+        scores = self._scores
+        for i in range(0, len(scores), 2):
+            if scores[i] == subject_id or scores[i] == ~subject_id:
+                scores[i] = key
+                scores[i + 1] = score
+                break
+        else:
+            # 新建而不是 append，数组不会预留多余的容量
+            self._scores = scores + array('d', (key, score))
+        self._average = None
+        return True
+
+    def get_average(self):
+        """计算平均分（结果会被缓存，直到下一次 add_score）"""
+        if self._average is None:
+            scores = self._scores
+            if not scores:
+                self._average = 0
+            else:
+                self._average = round(sum(scores[1::2]) / (len(scores) // 2), 2)
+        return self._average
+
+    def get_grade_level(self):
+        return grade_level_of(self.get_average())
+
+    def to_dict(self):
+        """转换为字典（格式与 Student.to_dict 相同）"""
+        return {
+            "student_id": self.student_id,
+            "name": self.name,
+            "grade": self.grade,
+            "age": self.age,
+            "subjects": self.subjects,
+            "created_date": self.created_date.isoformat()
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """从字典创建学生对象"""
+        student = cls(data["student_id"], data["name"], data["grade"], data["age"],
+                      data.get("created_date"))
+        student.subjects = data.get("subjects", {})
+        return student
+
+    @classmethod
+    def from_student(cls, student):
+        """从任意学生对象（例如存储后端读出的 Student）转换"""
+        return student if isinstance(student, cls) else cls.from_dict(student.to_dict())
+
+    def __str__(self):
+        return f"Student(ID:{self.student_id}, 姓名:{self.name}, 平均分:{self.get_average()})"
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""在进程池中执行的任务：批量导入的解析校验和分区统计（map-reduce）"""
+
+import csv
+import json
+
+from .models import GRADE_LEVELS, grade_level_of
+
+def _parse_import_chunk(file_format, fieldnames, lines, first_line_no):
+    """在子进程中解析并校验一批导入数据
+    
+    返回 (学生列表, 成绩列表, 错误列表)，都是简单元组，跨进程传输开销小。
+    同一行既可以描述学生（student_id/name/grade/age），也可以描述成绩（student_id/subject/score）。
+    """
+    students, scores, errors = [], [], []
+    if file_format == "csv":
+        rows = (dict(zip(fieldnames, values)) for values in csv.reader(lines))
+    else:
+        rows = iter(lines)  # 在下面的 try 里逐行解析，坏行只记为该行的错误
+    line_no = first_line_no
+    for row in rows:
+        try:
+            if file_format != "csv":
+                if not row.strip():
+                    continue
+                row = json.loads(row)
+                if not isinstance(row, dict):
+                    raise ValueError("每一行必须是JSON对象")
+            student_id = str(row.get("student_id") or "").strip()
+            if not student_id:
+                raise ValueError("学号不能为空")
+            if row.get("name"):
+                age = _parse_age(row.get("age"))
+                if age <= 0:
+                    raise ValueError("年龄必须是正整数")
+                students.append((student_id, str(row["name"]).strip(),
+                                 str(row.get("grade", "")).strip(), age))
+            if row.get("subject"):
+                score = row.get("score")
+                if isinstance(score, bool):
+                    raise ValueError("成绩必须是数字")
+                score = float(score)
+                if not 0 <= score <= 100:
+                    raise ValueError("成绩必须在0-100之间")
+                scores.append((student_id, str(row["subject"]).strip(), score))
+        except (TypeError, ValueError) as e:
+            errors.append((line_no, str(e)))
+        finally:
+            line_no += 1
+    return students, scores, errors
+
+def _parse_age(value):
+    """把导入的年龄转成整数；带小数的年龄视为错误而不是截断"""
+    if isinstance(value, bool):
+        raise ValueError("年龄必须是整数")
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError(f"年龄必须是整数：{value}")
+        return int(value)
+    if isinstance(value, str):
+        value = value.strip()
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"年龄必须是整数：{value!r}") from None
+
+def _accumulate(table, key, value):
+    """把一个值累加进分组 key 的部分聚合：[成员数, 有效数, 总和, 最高, 最低, 各等级人数...]
+    
+    value 为 None 时只计入成员数（例如还没有成绩的学生）。
+    """
+    acc = table.get(key)
+    if acc is None:
+        acc = table[key] = [0, 0, 0.0, None, None] + [0] * len(GRADE_LEVELS)
+    acc[0] += 1
+    if value is None:
+        return
+    acc[1] += 1
+    acc[2] += value
+    if acc[3] is None or value > acc[3]:
+        acc[3] = value
+    if acc[4] is None or value < acc[4]:
+        acc[4] = value
+    acc[5 + GRADE_LEVELS.index(grade_level_of(value))] += 1
+
+def _partial_statistics(rows):
+    """在子进程中计算一个分区的部分聚合
+    
+    rows 是 (年级, ((科目, 成绩), ...)) 的列表；返回按全班、年级、科目三种分组的部分聚合，
+    只包含少量数字，进程之间传输的数据很小。
+    """
+    partial = {"all": {}, "grade": {}, "subject": {}}
+    for grade, scores in rows:
+        avg = round(sum(score for _, score in scores) / len(scores), 2) if scores else 0
+        # 与 get_class_statistics 一致：平均分为0的学生不计入有效成绩
+        avg = avg if avg > 0 else None
+        _accumulate(partial["all"], None, avg)
+        _accumulate(partial["grade"], grade, avg)
+        for subject, score in scores:
+            _accumulate(partial["subject"], subject, score)
+    return partial
+
+def _merge_partial_tables(tables):
+    """合并多个分区的部分聚合"""
+    merged = {}
+    for table in tables:
+        for key, acc in table.items():
+            target = merged.get(key)
+            if target is None:
+                merged[key] = list(acc)
+                continue
+            target[0] += acc[0]
+            target[1] += acc[1]
+            target[2] += acc[2]
+            if acc[3] is not None and (target[3] is None or acc[3] > target[3]):
+                target[3] = acc[3]
+            if acc[4] is not None and (target[4] is None or acc[4] < target[4]):
+                target[4] = acc[4]
+            for i in range(5, len(acc)):
+                target[i] += acc[i]
+    return merged
+
+def _format_partial(acc):
+    """把合并后的部分聚合转成与 get_class_statistics 相同格式的结果"""
+    if not acc[0]:
+        return "暂无数据"
+    if not acc[1]:
+        return "暂无有效成绩数据"
+    return {
+        "总学生数": acc[0],
+        "班级平均分": round(acc[2] / acc[1], 2),
+        "最高分": acc[3],
+        "最低分": acc[4],
+        "等级分布": dict(zip(GRADE_LEVELS, acc[5:]))
+    }
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""学生查询：条件过滤、排序、分组聚合，以及简单的查询计划"""
+
+import operator
+
+class StudentQuery:
+    """学生查询：条件过滤、投影、排序、限制条数和分组聚合
+    
+    字段可以是学生属性（student_id、name、grade、age），也可以是
+    average（平均分）、level（等级）或 "score:科目"（某科成绩，没有成绩时为None）。
+    
+        manager.query().where("grade", "==", "高三").where("score:数学", ">=", 90) \
+               .order_by("average", descending=True).limit(10).select("name", "average").all()
+    """
+    
+    OPERATORS = {
+        "==": operator.eq, "!=": operator.ne,
+        ">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le,
+        "in": lambda value, options: value in options,
+        "contains": lambda value, part: part in value,
+    }
+    # 科目成绩条件 -> SubjectScoreIndex.between 的 (low, high, include_low, include_high)
+    SCORE_RANGES = {
+        "==": lambda v: (v, v, True, True),
+        ">": lambda v: (v, None, False, True), ">=": lambda v: (v, None, True, True),
+        "<": lambda v: (None, v, True, False), "<=": lambda v: (None, v, True, True),
+    }
+    AGGREGATES = {
+        "count": len,
+        "sum": sum,
+        "avg": lambda values: round(sum(values) / len(values), 2) if values else None,
+        "min": lambda values: min(values) if values else None,
+        "max": lambda values: max(values) if values else None,
+    }
+    
+    def __init__(self, manager):
+        self.manager = manager
+        self.filters = []    # (字段, 运算符, 值)
+        self.ordering = []   # (字段, 是否降序)
+        self.row_limit = None
+        self.fields = None
+        self.group_field = None
+        self.aggregations = None
+    
+    def where(self, field, op, value):
+        """增加过滤条件（多个条件之间是“且”的关系）"""
+        if op not in self.OPERATORS:
+            raise ValueError(f"不支持的运算符：{op}")
+        self.filters.append((field, op, value))
+        return self
+    
+    def order_by(self, field, descending=False):
+        """按字段排序，可多次调用形成多级排序"""
+        self.ordering.append((field, descending))
+        return self
+    
+    def limit(self, n):
+        """只返回前n条"""
+        self.row_limit = n
+        return self
+    
+    def select(self, *fields):
+        """只返回指定字段（结果变为字典）"""
+        self.fields = fields
+        return self
+    
+    def group_by(self, field, **aggregations):
+        """分组聚合，例如 group_by("grade", 人数=("count", "student_id"), 平均=("avg", "average"))"""
+        for name, (func, _) in aggregations.items():
+            if func not in self.AGGREGATES:
+                raise ValueError(f"不支持的聚合函数：{func}")
+        self.group_field = field
+        self.aggregations = aggregations or {"count": ("count", "student_id")}
+        return self
+    
+    @staticmethod
+    def value_of(student, field):
+        """读取学生的某个字段"""
+        if field == "average":
+            return student.get_average()
+        if field == "level":
+            return student.get_grade_level()
+        if field.startswith("score:"):
+            return student.subjects.get(field[len("score:"):])
+        return getattr(student, field)
+    
+    def _matches(self, student, filters):
+        for field, op, value in filters:
+            actual = self.value_of(student, field)
+            if actual is None or not self.OPERATORS[op](actual, value):
+                return False
+        return True
+    
+    def plan(self):
+        """选择数据来源，返回 (说明, 候选学生的生成函数, 剩余需要逐条检查的条件)"""
+        manager = self.manager
+        for i, (field, op, value) in enumerate(self.filters):
+            rest = self.filters[:i] + self.filters[i + 1:]
+            if field == "student_id" and op == "==":
+                return (f"主键索引：student_id == {value!r}",
+                        lambda: [s for s in [manager.index.get(value)] if s], rest)
+            if field == "student_id" and op == "in":
+                return (f"主键索引：student_id in {len(value)}个值",
+                        lambda: [s for s in map(manager.index.get, value) if s], rest)
+        for i, (field, op, value) in enumerate(self.filters):
+            rest = self.filters[:i] + self.filters[i + 1:]
+            if op == "==" and field in manager.index.secondary:
+                return (f"二级索引：{field} == {value!r}",
+                        lambda: manager.index.find_by(field, value), rest)
+        for i, (field, op, value) in enumerate(self.filters):
+            rest = self.filters[:i] + self.filters[i + 1:]
+            if field.startswith("score:") and op in self.SCORE_RANGES:
+                subject = field[len("score:"):]
+                bounds = self.SCORE_RANGES[op](value)
+                return (f"科目成绩索引：{field} {op} {value!r}",
+                        lambda: [manager.index.get(student_id) for _, student_id
+                                 in manager.subject_index.between(subject, *bounds)], rest)
+        if (not self.filters and self.group_field is None and self.row_limit is not None
+                and len(self.ordering) == 1 and self.ordering[0][0] == "average"):
+            if self.ordering[0][1]:
+                return ("排行榜：按平均分取前N名", lambda: manager.leaderboard.top(self.row_limit), [])
+            return ("排行榜：按平均分取后N名", lambda: manager.leaderboard.bottom(self.row_limit), [])
+        return "全表扫描", lambda: manager.students, self.filters
+    
+    def explain(self):
+        """说明查询会如何执行"""
+        source, _, residual = self.plan()
+        lines = [f"数据来源：{source}"]
+        if residual:
+            lines.append("逐条过滤：" + " 且 ".join(f"{f} {op} {v!r}" for f, op, v in residual))
+        if self.group_field is not None:
+            lines.append(f"分组：{self.group_field}，聚合：{', '.join(self.aggregations)}")
+        if self.ordering:
+            lines.append("排序：" + ", ".join(f"{f} {'降序' if d else '升序'}" for f, d in self.ordering))
+        if self.row_limit is not None:
+            lines.append(f"限制：{self.row_limit} 条")
+        return "\n".join(lines)
+    
+    def all(self):
+        """执行查询，返回结果列表"""
+        _, source, residual = self.plan()
+        rows = [s for s in source() if self._matches(s, residual)] if residual else list(source())
+        
+        if self.group_field is not None:
+            groups = {}
+            for student in rows:
+                groups.setdefault(self.value_of(student, self.group_field), []).append(student)
+            rows = []
+            for key, members in groups.items():
+                row = {self.group_field: key}
+                for name, (func, field) in self.aggregations.items():
+                    values = [v for v in (self.value_of(m, field) for m in members) if v is not None]
+                    row[name] = self.AGGREGATES[func](values)
+                rows.append(row)
+            getter = lambda row, field: row.get(field)
+        else:
+            getter = self.value_of
+        
+        # 多级排序：从最后一个排序键开始做稳定排序；None 总是排在最后
+        for field, descending in reversed(self.ordering):
+            present = [row for row in rows if getter(row, field) is not None]
+            missing = [row for row in rows if getter(row, field) is None]
+            present.sort(key=lambda row: getter(row, field), reverse=descending)
+            rows = present + missing
+        if self.row_limit is not None:
+            rows = rows[:self.row_limit]
+        if self.fields is not None:
+            rows = [{field: getter(row, field) for field in self.fields} for row in rows]
+        return rows
+    
+    def first(self):
+        """返回第一条结果，没有结果时返回None"""
+        rows = self.limit(1).all()
+        return rows[0] if rows else None
@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+"""基于 asyncio 的本地 HTTP/JSON 服务"""
+
+import io
+import json
+import asyncio
+from contextlib import redirect_stdout
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from .concurrency import ConcurrentStudentManager
+
+class StudentService:
+    """基于 asyncio 的本地 HTTP/JSON 服务（仅用标准库）
+    
+    接口：
+        GET    /students/<学号>            查询学生
+        POST   /students                  添加学生 {student_id, name, grade, age}
+        DELETE /students/<学号>            删除学生
+        POST   /students/<学号>/scores     添加成绩 {subject, score}
+        GET    /statistics                班级统计
+        GET    /top?n=10                  前n名
+        GET    /metrics                   服务计数（批次数、保存次数等）
+        POST   /save                      立即保存
+    
+    写请求先进入队列，由后台任务成批地在一次写锁内执行；保存也被合并，
+    每隔 save_interval 秒最多保存一次。写请求在修改生效后即返回，不等待落盘。
+    """
+    
+    REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+               405: "Method Not Allowed", 409: "Conflict", 500: "Internal Server Error"}
+    
+    def __init__(self, manager=None, host="127.0.0.1", port=8765, save_interval=1.0):
+        if manager is None:
+            manager = ConcurrentStudentManager()
+        if not isinstance(manager, ConcurrentStudentManager):
+            raise ValueError("StudentService 需要 ConcurrentStudentManager")
+        self.manager = manager
+        self.host = host
+        self.port = port
+        self.save_interval = save_interval
+        self.metrics = {"requests": 0, "mutations": 0, "batches": 0, "saves": 0}
+        self._pending = []  # (操作, 参数, future)
+        self._dirty = 0
+        self._closing = False
+        self._wake = None
+        self._server = None
+        self._tasks = []
+        self._connections = set()
+        # 修改、保存和读取都在线程里执行，它们之间由管理器的读写锁互斥，事件循环不会被阻塞；
+        # 读取单独用一个线程池，写锁被占用时排队的只是读线程
+        self._executor = ThreadPoolExecutor(max_workers=2)
+        self._read_executor = ThreadPoolExecutor(max_workers=4)
+    
+    async def start(self):
+        """启动服务（port=0 时由系统分配端口）"""
+        self._wake = asyncio.Event()
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._tasks = [asyncio.ensure_future(self._batch_writer()),
+                       asyncio.ensure_future(self._saver())]
+        return self
+    
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        print(f"🌐 服务已启动：http://{self.host}:{self.port}")
+        async with self._server:
+            await self._server.serve_forever()
+    
+    async def stop(self):
+        """停止服务，并把未保存的修改写入文件"""
+        self._server.close()
+        for writer in list(self._connections):
+            writer.close()  # 让仍在等待请求的连接读到EOF后正常退出
+        await self._server.wait_closed()
+        # 批量写入任务执行完正在进行和已排队的批次后自行退出，不能中途取消，
+        # 否则批次仍在线程里执行，等待者却拿不到结果，修改也没有计入 _dirty
+        batch_writer, saver = self._tasks
+        self._closing = True
+        self._wake.set()
+        await batch_writer
+        saver.cancel()
+        await asyncio.gather(saver, return_exceptions=True)
+        if self._pending:
+            await self._flush_pending()
+        if self._dirty:
+            await self._save_dirty()
+        self._executor.shutdown()
+        self._read_executor.shutdown()
+    
+    def _save(self):
+        with redirect_stdout(io.StringIO()):
+            ok = self.manager.save_data()
+        self.metrics["saves"] += 1
+        return ok
+    
+    async def _save_dirty(self):
+        """在保存线程中保存；_dirty 只在事件循环中修改，保存期间完成的批次不会被清零"""
+        dirty, self._dirty = self._dirty, 0
+        ok = False
+        try:
+            ok = await asyncio.get_running_loop().run_in_executor(self._executor, self._save)
+        finally:
+            if not ok:
+                self._dirty += dirty  # 保存失败或被取消，留给下一次保存
+        return ok
+    
+    def _apply_batch(self, batch):
+        """在一次写锁内依次执行一批修改，返回每个操作的 (是否成功, 提示信息)"""
+        results = []
+        with self.manager.lock.write_locked():
+            for op, args, _ in batch:
+                output = io.StringIO()
+                try:
+                    with redirect_stdout(output):
+                        ok = getattr(self.manager, op)(*args)
+                except Exception as e:
+                    # 一个操作出错只影响它自己，不能让整批和后台任务一起失败
+                    results.append((False, f"操作失败：{e}"))
+                    continue
+                results.append((bool(ok), output.getvalue().strip()))
+        return results
+    
+    async def _flush_pending(self):
+        batch, self._pending = self._pending, []
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self._executor, self._apply_batch, batch)
+        except Exception as e:
+            # 整批执行失败时把异常交给每个等待者，后台任务继续运行
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, _, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+        self._dirty += len(batch)
+        self.metrics["mutations"] += len(batch)
+        self.metrics["batches"] += 1
+    
+    async def _batch_writer(self):
+        """后台任务：把排队的写请求合并成批执行"""
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            if self._pending:
+                await self._flush_pending()
+            if self._closing:
+                return
+    
+    async def _saver(self):
+        """后台任务：定期保存，多次修改只触发一次保存"""
+        while True:
+            await asyncio.sleep(self.save_interval)
+            if self._dirty:
+                await self._save_dirty()
+    
+    async def _submit(self, op, *args):
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((op, args, future))
+        self._wake.set()
+        return await future
+    
+    @staticmethod
+    def _student_payload(student):
+        data = student.to_dict()
+        data["average"] = student.get_average()
+        data["level"] = student.get_grade_level()
+        return data
+    
+    @staticmethod
+    def _field(payload, name, types):
+        """取出请求体中的字段并检查类型（bool 不算数字）"""
+        if not isinstance(payload, dict):
+            raise ValueError("请求体必须是JSON对象")
+        value = payload[name]
+        if isinstance(value, bool) or not isinstance(value, types):
+            raise ValueError(f"字段 {name} 的类型不正确")
+        if isinstance(value, str) and not value.strip():
+            raise ValueError(f"字段 {name} 不能为空")
+        return value
+    
+    async def _read(self, func, *args):
+        """在读线程池中执行读操作（读锁由 ConcurrentStudentManager 的方法自己获取）"""
+        return await asyncio.get_running_loop().run_in_executor(self._read_executor, func, *args)
+    
+    def _student_detail(self, student_id):
+        with self.manager.lock.read_locked():
+            student = self.manager.find_student(student_id)
+            return None if student is None else self._student_payload(student)
+    
+    def _top_students(self, n):
+        with self.manager.lock.read_locked():
+            return [self._student_payload(s) for s in self.manager.get_top_students(n)]
+    
+    async def _dispatch(self, method, target, body):
+        """路由请求，返回 (状态码, JSON对象)"""
+        url = urlsplit(target)
+        parts = [unquote(part) for part in url.path.split("/") if part]
+        payload = json.loads(body.decode('utf-8')) if body else {}
+        
+        if parts == ["students"] and method == "POST":
+            ok, message = await self._submit(
+                "add_student", str(self._field(payload, "student_id", (str, int))),
+                self._field(payload, "name", str), self._field(payload, "grade", str),
+                self._field(payload, "age", int))
+            return (201 if ok else 409), {"ok": ok, "message": message}
+        if len(parts) == 2 and parts[0] == "students":
+            if method == "GET":
+                data = await self._read(self._student_detail, parts[1])
+                if data is None:
+                    return 404, {"ok": False, "message": f"找不到学号为 {parts[1]} 的学生"}
+                return 200, data
+            if method == "DELETE":
+                ok, message = await self._submit("remove_student", parts[1])
+                return (200 if ok else 404), {"ok": ok, "message": message}
+        if len(parts) == 3 and parts[0] == "students" and parts[2] == "scores" and method == "POST":
+            ok, message = await self._submit(
+                "add_student_score", parts[1], self._field(payload, "subject", str),
+                self._field(payload, "score", (int, float)))
+            return (200 if ok else 400), {"ok": ok, "message": message}
+        if parts == ["statistics"] and method == "GET":
+            return 200, await self._read(self.manager.get_class_statistics)
+        if parts == ["top"] and method == "GET":
+            n = int(parse_qs(url.query).get("n", ["10"])[0])
+            return 200, await self._read(self._top_students, n)
+        if parts == ["metrics"] and method == "GET":
+            return 200, dict(self.metrics, pending=len(self._pending))
+        if parts == ["save"] and method == "POST":
+            return 200, {"ok": await self._save_dirty()}
+        return 404, {"ok": False, "message": "未知接口"}
+    
+    async def _respond(self, writer, status, result):
+        data = json.dumps(result, ensure_ascii=False).encode('utf-8')
+        writer.write((f"HTTP/1.1 {status} {self.REASONS[status]}\r\n"
+                      f"Content-Type: application/json; charset=utf-8\r\n"
+                      f"Content-Length: {len(data)}\r\n\r\n").encode('latin-1') + data)
+        await writer.drain()
+    
+    async def _handle_connection(self, reader, writer):
+        """处理一个连接（支持 keep-alive，同一连接上可以连续发送请求）"""
+        self._connections.add(writer)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode('latin-1').partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                self.metrics["requests"] += 1
+                try:
+                    method, target, _ = request_line.decode('latin-1').split(" ", 2)
+                    length = int(headers.get("content-length", 0))
+                    if length < 0:
+                        raise ValueError(f"Content-Length 不能为负数：{length}")
+                except ValueError as e:
+                    # 请求行或请求头无法解析时，无法确定下一个请求从哪里开始，回复后关闭连接
+                    await self._respond(writer, 400, {"ok": False, "message": f"请求格式错误：{e}"})
+                    break
+                body = await reader.readexactly(length) if length else b""
+                
+                try:
+                    status, result = await self._dispatch(method, target, body)
+                except (KeyError, ValueError, TypeError) as e:
+                    status, result = 400, {"ok": False, "message": f"请求格式错误：{e}"}
+                except Exception as e:
+                    status, result = 500, {"ok": False, "message": f"服务内部错误：{e}"}
+                await self._respond(writer, status, result)
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+async def _http_request(reader, writer, method, path, payload=None):
+    """最简单的 HTTP/1.1 客户端请求（keep-alive），返回 (状态码, JSON对象)"""
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8') if payload is not None else b""
+    writer.write((f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+                  f"Content-Length: {len(body)}\r\n\r\n").encode('latin-1') + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode('latin-1').partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
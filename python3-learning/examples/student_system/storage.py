@@ -0,0 +1,592 @@
+# -*- coding: utf-8 -*-
+"""存储层：存储后端接口，以及JSON、SQLite、二进制和编解码器文件后端"""
+
+import os
+import re
+import gzip
+import json
+import lzma
+import mmap
+import marshal
+import struct
+import sqlite3
+import threading
+from array import array
+from itertools import groupby
+from pathlib import Path
+
+from .models import GRADE_LEVELS, Student
+from .indexes import ClassAggregates
+
+# 数组元素之间的空白和逗号
+_SEPARATORS = re.compile(r"[ \t\r\n,]*")
+
+def iter_json_array(file_path, chunk_size=1 << 16):
+    """逐个读出JSON数组中的元素（生成器），不需要把整个文件读进内存"""
+    # scan_once 就是 raw_decode 内部调用的扫描器，直接调用省去每个元素一层包装
+    scan_once = json.JSONDecoder().scan_once
+    skip = _SEPARATORS.match
+    with open(file_path, 'r', encoding='utf-8') as f:
+        buffer = ""
+        pos = 0
+        started = False
+        eof = False
+        while True:
+            # 跳过空白和元素之间的逗号（用正则一次跳过，而不是逐个字符判断）
+            pos = skip(buffer, pos).end()
+            if pos >= len(buffer):
+                if eof:
+                    raise ValueError("JSON数组不完整")
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                continue
+            if not started:
+                if buffer[pos] != "[":
+                    raise ValueError("数据文件必须是JSON数组")
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == "]":
+                return
+            try:
+                item, pos = scan_once(buffer, pos)
+            except (StopIteration, json.JSONDecodeError):
+                # 元素跨越了块边界，继续读入下一块；已经读到文件末尾时才是格式错误
+                if eof:
+                    json.JSONDecoder().raw_decode(buffer, pos)  # 抛出带位置信息的 JSONDecodeError
+                    raise
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                continue
+            yield item
+
+def iter_students(file_path):
+    """流式读取数据文件，逐个生成 Student 对象；只读的报表可以直接遍历而不必整体加载"""
+    return map(Student.from_dict, iter_json_array(file_path))
+
+class StorageBackend:
+    """存储后端接口：StudentManager 通过它加载和保存学生数据"""
+    
+    incremental = False  # 为True时修改会通过 apply 逐条写入，save_data 只需 flush
+    
+    def exists(self):
+        """是否已有保存的数据"""
+        raise NotImplementedError
+    
+    def load(self):
+        """逐个生成已保存的学生"""
+        raise NotImplementedError
+    
+    def save(self, students, compact=False):
+        """完整保存全部学生；compact=True 表示不需要便于阅读的格式（例如合并日志时）"""
+        raise NotImplementedError
+    
+    def apply(self, record):
+        """接收一条修改记录（格式与日志记录相同），默认忽略"""
+    
+    def flush(self):
+        """把尚未写入的修改落盘，默认无操作"""
+    
+    def statistics(self):
+        """由存储层直接计算班级统计，不支持时返回None"""
+        return None
+    
+    def close(self):
+        """释放资源"""
+
+class JsonFileBackend(StorageBackend):
+    """默认后端：整个名单保存为一个JSON文件"""
+    
+    def __init__(self, data_file):
+        self.data_file = data_file
+    
+    def exists(self):
+        return Path(self.data_file).exists()
+    
+    def load(self):
+        return iter_students(self.data_file)
+    
+    def save(self, students, compact=False):
+        """先写临时文件并 fsync，再原子替换，写到一半时崩溃也不会损坏原数据文件"""
+        data = [student.to_dict() for student in students]
+        tmp_file = self.data_file + ".tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=None if compact else 2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.data_file)
+
+class SQLiteBackend(StorageBackend):
+    """SQLite后端：学生和成绩存放在带索引的表中，修改按批次在事务里提交
+    
+    注意：通过 StudentManager 使用时，加载仍会把整张表读进内存并建立各种索引，
+    所以名单大小仍受内存限制；这里只省去了每次保存时重写整个文件。
+    名单大到放不进内存时，请直接使用 get_student（按学号查询）和 statistics（SQL聚合），
+    不要交给 StudentManager 加载。
+    """
+    
+    incremental = True
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS students (
+            student_id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            grade TEXT NOT NULL,
+            age INTEGER NOT NULL,
+            created_date TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS scores (
+            student_id TEXT NOT NULL REFERENCES students(student_id) ON DELETE CASCADE,
+            subject TEXT NOT NULL,
+            score REAL NOT NULL,
+            PRIMARY KEY (student_id, subject)
+        );
+        CREATE INDEX IF NOT EXISTS idx_students_grade ON students(grade);
+        CREATE INDEX IF NOT EXISTS idx_students_name ON students(name);
+        CREATE INDEX IF NOT EXISTS idx_scores_subject ON scores(subject, score);
+    """
+    
+    def __init__(self, db_file="students_data.db", batch_size=500):
+        self.db_file = db_file
+        self.batch_size = batch_size
+        self.pending = []  # 尚未提交的修改记录
+        self._lock = threading.RLock()  # 连接允许跨线程使用，由这把锁保证同一时刻只有一个线程访问
+        self.conn = sqlite3.connect(db_file, check_same_thread=False)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(self.SCHEMA)
+    
+    def exists(self):
+        with self._lock:
+            return self.conn.execute("SELECT 1 FROM students LIMIT 1").fetchone() is not None
+    
+    def load(self):
+        """按插入顺序流式读取，每个学生的成绩通过一次连接查询一起取出"""
+        self.flush()
+        with self._lock:
+            cursor = self.conn.execute("""
+                SELECT s.student_id, s.name, s.grade, s.age, s.created_date, sc.subject, sc.score
+                FROM students s LEFT JOIN scores sc ON sc.student_id = s.student_id
+                ORDER BY s.rowid
+            """)
+        
+        def rows():
+            while True:
+                with self._lock:
+                    batch = cursor.fetchmany(1000)
+                if not batch:
+                    return
+                yield from batch
+        
+        for _, student_rows in groupby(rows(), key=lambda row: row[0]):
+            yield self._to_student(list(student_rows))
+    
+    @staticmethod
+    def _to_student(rows):
+        student_id, name, grade, age, created_date = rows[0][:5]
+        student = Student(student_id, name, grade, age, created_date)
+        student.subjects = {row[5]: row[6] for row in rows if row[5] is not None}
+        return student
+    
+    def get_student(self, student_id):
+        """按学号读取单个学生（走主键索引）"""
+        self.flush()
+        with self._lock:
+            rows = self.conn.execute("""
+                SELECT s.student_id, s.name, s.grade, s.age, s.created_date, sc.subject, sc.score
+                FROM students s LEFT JOIN scores sc ON sc.student_id = s.student_id
+                WHERE s.student_id = ?
+            """, (student_id,)).fetchall()
+        return self._to_student(rows) if rows else None
+    
+    def save(self, students, compact=False):
+        """在一个事务中整体替换全部数据"""
+        with self._lock, self.conn:
+            self.pending.clear()
+            self.conn.execute("DELETE FROM scores")
+            self.conn.execute("DELETE FROM students")
+            for student in students:
+                self._insert(student.to_dict())
+    
+    def apply(self, record):
+        with self._lock:
+            self.pending.append(record)
+            if len(self.pending) >= self.batch_size:
+                self.flush()
+    
+    def flush(self):
+        """把积累的修改放在一个事务中提交"""
+        with self._lock:
+            if not self.pending:
+                return
+            with self.conn:
+                for record in self.pending:
+                    op = record["op"]
+                    if op == "add":
+                        self._insert(record["student"])
+                    elif op == "remove":
+                        self.conn.execute("DELETE FROM students WHERE student_id = ?",
+                                          (record["student_id"],))
+                    elif op == "score":
+                        self.conn.execute(
+                            "INSERT OR REPLACE INTO scores (student_id, subject, score) VALUES (?, ?, ?)",
+                            (record["student_id"], record["subject"], record["score"]))
+            self.pending.clear()
+    
+    def _insert(self, data):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO students (student_id, name, grade, age, created_date) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (data["student_id"], data["name"], data["grade"], data["age"], data["created_date"]))
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO scores (student_id, subject, score) VALUES (?, ?, ?)",
+            [(data["student_id"], subject, score) for subject, score in data["subjects"].items()])
+    
+    def statistics(self):
+        """用SQL聚合计算班级统计，结果格式与 get_class_statistics 相同"""
+        self.flush()
+        with self._lock:
+            row = self._aggregate_row()
+        total_students, valid = row[0], row[1] or 0
+        if not total_students:
+            return "暂无数据"
+        if not valid:
+            return "暂无有效成绩数据"
+        return {
+            "总学生数": total_students,
+            "班级平均分": round(row[2], 2),
+            "最高分": row[3],
+            "最低分": row[4],
+            "等级分布": dict(zip(GRADE_LEVELS, row[5:9]))
+        }
+    
+    def _aggregate_row(self):
+        return self.conn.execute("""
+            WITH averages AS (
+                SELECT s.student_id, COALESCE(ROUND(AVG(sc.score), 2), 0) AS avg
+                FROM students s LEFT JOIN scores sc ON sc.student_id = s.student_id
+                GROUP BY s.student_id
+            )
+            SELECT COUNT(*),
+                   SUM(avg > 0),
+                   AVG(CASE WHEN avg > 0 THEN avg END),
+                   MAX(CASE WHEN avg > 0 THEN avg END),
+                   MIN(CASE WHEN avg > 0 THEN avg END),
+                   SUM(avg >= 90),
+                   SUM(avg >= 80 AND avg < 90),
+                   SUM(avg >= 60 AND avg < 80),
+                   SUM(avg > 0 AND avg < 60)
+            FROM averages
+        """).fetchone()
+    
+    def close(self):
+        self.flush()
+        with self._lock:
+            self.conn.close()
+
+class BinaryRoster:
+    """紧凑的定长二进制名单格式（小端序），通过 mmap 按需读取
+    
+    文件布局：
+        文件头    魔数、版本、学生数、字符串数，以及各区段的偏移量
+        字符串表  (字符串数+1) 个 uint32 偏移 + UTF-8 数据（学号、姓名、年级、科目、日期）
+        学生记录  每人28字节：学号/姓名/年级/日期的字符串编号、年龄（int32）、成绩起始位置、成绩数量
+        学号索引  按学号字节序排好的记录编号，用于二分查找
+        平均分列  每人一个 float64，可以零拷贝地当作数组读取
+        成绩记录  每条12字节：科目字符串编号 + float64 成绩
+    """
+    
+    MAGIC = b"STUR"
+    VERSION = 2  # 版本2把年龄改为有符号整数，其余布局与版本1相同
+    HEADER = struct.Struct("<4sHHIIQQQQQ")
+    RECORD = struct.Struct("<3IiIII")
+    SCORE = struct.Struct("<Id")
+    
+    def __init__(self, file_path=None, buffer=None):
+        """打开文件并映射到内存；也可以直接传入已经在内存中的 buffer（bytes 等）"""
+        self.file_path = file_path
+        if buffer is not None:
+            self._file = None
+            self._mm = buffer
+        else:
+            self._file = open(file_path, 'rb')
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, _, self.count, self.string_count, self._strings_off, self._records_off,
+         self._index_off, self._averages_off, self._scores_off) = self.HEADER.unpack_from(self._mm, 0)
+        if magic != self.MAGIC or version not in (1, self.VERSION):
+            self.close()
+            raise ValueError("不是有效的二进制名单文件")
+        self._blob_off = self._strings_off + 4 * (self.string_count + 1)
+    
+    @classmethod
+    def write(cls, file_path, students):
+        """把学生列表写成二进制文件（先写临时文件再原子替换，已映射旧文件的读者不受影响）"""
+        tmp_file = file_path + ".tmp"
+        with open(tmp_file, 'wb') as f:
+            f.write(cls.encode(students))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, file_path)
+    
+    @classmethod
+    def encode(cls, students):
+        """把学生列表编码成二进制名单格式的字节串"""
+        strings = {}
+        
+        def intern(text):
+            if text not in strings:
+                strings[text] = len(strings)
+            return strings[text]
+        
+        records = bytearray()
+        scores = bytearray()
+        averages = array('d')
+        score_count = 0
+        ids = []
+        for student in students:
+            data = student.to_dict()
+            records += cls.RECORD.pack(intern(data["student_id"]), intern(data["name"]),
+                                       intern(data["grade"]), data["age"],
+                                       intern(data["created_date"]), score_count,
+                                       len(data["subjects"]))
+            for subject, score in data["subjects"].items():
+                scores += cls.SCORE.pack(intern(subject), score)
+            score_count += len(data["subjects"])
+            averages.append(student.get_average())
+            ids.append(data["student_id"].encode('utf-8'))
+        index = array('I', sorted(range(len(ids)), key=ids.__getitem__))
+        
+        encoded = [text.encode('utf-8') for text in strings]
+        offsets = array('I', [0])
+        for item in encoded:
+            offsets.append(offsets[-1] + len(item))
+        blob = b"".join(encoded)
+        
+        strings_off = cls.HEADER.size
+        records_off = strings_off + 4 * len(offsets) + len(blob)
+        index_off = records_off + len(records)
+        averages_off = index_off + 4 * len(index)
+        averages_off += -averages_off % 8  # 对齐到8字节，方便直接 cast 成 double 数组
+        scores_off = averages_off + 8 * len(averages)
+        
+        return b"".join([
+            cls.HEADER.pack(cls.MAGIC, cls.VERSION, 0, len(ids), len(strings), strings_off,
+                            records_off, index_off, averages_off, scores_off),
+            offsets.tobytes(),
+            blob,
+            records,
+            index.tobytes(),
+            b"\0" * (averages_off - index_off - 4 * len(index)),
+            averages.tobytes(),
+            scores,
+        ])
+    
+    def _string_bytes(self, number):
+        start, end = struct.unpack_from("<II", self._mm, self._strings_off + 4 * number)
+        return self._mm[self._blob_off + start:self._blob_off + end]
+    
+    def _string(self, number):
+        return self._string_bytes(number).decode('utf-8')
+    
+    def _record(self, record_no):
+        return self.RECORD.unpack_from(self._mm, self._records_off + self.RECORD.size * record_no)
+    
+    def _indexed(self, position):
+        """学号索引第 position 项对应的 (记录编号, 学号字节)"""
+        record_no = struct.unpack_from("<I", self._mm, self._index_off + 4 * position)[0]
+        return record_no, self._string_bytes(self._record(record_no)[0])
+    
+    def _find(self, student_id):
+        """在学号索引上二分查找，返回记录编号"""
+        target = student_id.encode('utf-8')
+        low, high = 0, self.count
+        while low < high:
+            mid = (low + high) // 2
+            if self._indexed(mid)[1] < target:
+                low = mid + 1
+            else:
+                high = mid
+        if low < self.count:
+            record_no, key = self._indexed(low)
+            if key == target:
+                return record_no
+        return None
+    
+    def _student_at(self, record_no):
+        id_no, name_no, grade_no, age, date_no, start, length = self._record(record_no)
+        student = Student(self._string(id_no), self._string(name_no), self._string(grade_no), age,
+                          self._string(date_no))
+        subjects = {}
+        for i in range(start, start + length):
+            subject_no, score = self.SCORE.unpack_from(self._mm, self._scores_off + self.SCORE.size * i)
+            subjects[self._string(subject_no)] = score
+        student.subjects = subjects
+        return student
+    
+    def __len__(self):
+        return self.count
+    
+    def __contains__(self, student_id):
+        return self._find(student_id) is not None
+    
+    def get_student(self, student_id):
+        """只把这一个学生解码成 Student 对象"""
+        record_no = self._find(student_id)
+        return None if record_no is None else self._student_at(record_no)
+    
+    def get_average(self, student_id):
+        """直接读取预先计算好的平均分"""
+        record_no = self._find(student_id)
+        if record_no is None:
+            return None
+        return struct.unpack_from("<d", self._mm, self._averages_off + 8 * record_no)[0]
+    
+    def averages(self):
+        """全部平均分的零拷贝视图（memoryview，格式'd'）"""
+        return memoryview(self._mm)[self._averages_off:self._averages_off + 8 * self.count].cast('d')
+    
+    def iter_students(self):
+        """按写入顺序逐个解码学生"""
+        for record_no in range(self.count):
+            yield self._student_at(record_no)
+    
+    def statistics(self):
+        """基于平均分列计算班级统计，格式与 get_class_statistics 相同"""
+        if not self.count:
+            return "暂无数据"
+        stats = ClassAggregates()
+        view = self.averages()
+        try:
+            for avg in view:
+                stats.add(avg)
+        finally:
+            view.release()
+        return stats.statistics(self.count)
+    
+    def close(self):
+        if self._file is not None:
+            self._mm.close()
+            self._file.close()
+            self._file = None
+        self._mm = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+class BinaryFileBackend(StorageBackend):
+    """二进制名单后端：以 BinaryRoster 格式整体保存，读取时通过 mmap 解码"""
+    
+    def __init__(self, data_file="students_data.bin"):
+        self.data_file = data_file
+    
+    def exists(self):
+        return Path(self.data_file).exists()
+    
+    def load(self):
+        with BinaryRoster(self.data_file) as roster:
+            yield from roster.iter_students()
+    
+    def save(self, students, compact=False):
+        BinaryRoster.write(self.data_file, students)
+
+class JsonCodec:
+    """JSON编解码；indent=None 时使用紧凑格式（没有缩进和多余空格）"""
+    
+    def __init__(self, indent=None):
+        self.indent = indent
+        self.separators = None if indent is not None else (",", ":")
+    
+    def encode(self, students):
+        data = [student.to_dict() for student in students]
+        return json.dumps(data, ensure_ascii=False, indent=self.indent,
+                          separators=self.separators).encode('utf-8')
+    
+    def decode(self, payload):
+        return [Student.from_dict(item) for item in json.loads(payload.decode('utf-8'))]
+
+class MarshalCodec:
+    """marshal 二进制编解码：每个学生是一个元组，速度快（格式与Python版本相关，只适合本机缓存）"""
+    
+    def encode(self, students):
+        return marshal.dumps([(s.student_id, s.name, s.grade, s.age, s.to_dict()["created_date"],
+                               s.subjects) for s in students])
+    
+    def decode(self, payload):
+        students = []
+        for student_id, name, grade, age, created_date, subjects in marshal.loads(payload):
+            student = Student(student_id, name, grade, age, created_date)
+            student.subjects = subjects
+            students.append(student)
+        return students
+
+class StructCodec:
+    """基于 struct 的二进制编解码：复用 BinaryRoster 的定长格式，跨Python版本稳定"""
+    
+    def encode(self, students):
+        return BinaryRoster.encode(students)
+    
+    def decode(self, payload):
+        return list(BinaryRoster(buffer=payload).iter_students())
+
+class CompressedCodec:
+    """在另一个编解码器外面套一层压缩（gzip 或 lzma）"""
+    
+    def __init__(self, inner, compressor):
+        self.inner = inner
+        self.compressor = compressor
+    
+    def encode(self, students):
+        return self.compressor.compress(self.inner.encode(students))
+    
+    def decode(self, payload):
+        return self.inner.decode(self.compressor.decompress(payload))
+
+CODECS = {
+    "json": JsonCodec(indent=2),
+    "json-compact": JsonCodec(),
+    "json-compact+gzip": CompressedCodec(JsonCodec(), gzip),
+    "json-compact+lzma": CompressedCodec(JsonCodec(), lzma),
+    "marshal": MarshalCodec(),
+    "marshal+gzip": CompressedCodec(MarshalCodec(), gzip),
+    "marshal+lzma": CompressedCodec(MarshalCodec(), lzma),
+    "struct": StructCodec(),
+    "struct+gzip": CompressedCodec(StructCodec(), gzip),
+}
+
+def register_codec(name, codec):
+    """注册自定义编解码器（需要有 encode(students) -> bytes 和 decode(bytes) -> 学生列表）"""
+    CODECS[name] = codec
+
+def get_codec(name):
+    """按名称取得编解码器"""
+    if name not in CODECS:
+        raise ValueError(f"未知的编解码器：{name}，可选：{', '.join(CODECS)}")
+    return CODECS[name]
+
+class CodecFileBackend(StorageBackend):
+    """使用指定编解码器整体保存名单的文件后端"""
+    
+    def __init__(self, data_file, codec="json-compact+gzip"):
+        self.data_file = data_file
+        self.codec = get_codec(codec)
+    
+    def exists(self):
+        return Path(self.data_file).exists()
+    
+    def load(self):
+        with open(self.data_file, 'rb') as f:
+            return iter(self.codec.decode(f.read()))
+    
+    def save(self, students, compact=False):
+        tmp_file = self.data_file + ".tmp"
+        with open(tmp_file, 'wb') as f:
+            f.write(self.codec.encode(students))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.data_file)